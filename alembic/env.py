@@ -16,6 +16,9 @@ from app.models.user import User
 from app.models.subject import Subject
 from app.models.task import Task
 from app.models.schedule import Schedule
+from app.models.user_stats import UserStats
+from app.models.user_daily_stats import UserDailyStats
+from app.models.job import Job
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,38 @@
+"""Add user_stats rollup table
+
+Revision ID: 002_user_stats
+Revises: 001_initial_schema
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '002_user_stats'
+down_revision: Union[str, None] = '001_initial_schema'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-user counters maintained by the task/schedule services.
+    # Existing users are backfilled with `python rebuild_stats.py`.
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('todo_tasks', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('in_progress_tasks', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('done_tasks', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_estimated_minutes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('total_scheduled_seconds', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_stats')
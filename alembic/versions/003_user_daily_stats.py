@@ -0,0 +1,36 @@
+"""Add user_daily_stats rollup table
+
+Revision ID: 003_user_daily_stats
+Revises: 002_user_stats
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '003_user_daily_stats'
+down_revision: Union[str, None] = '002_user_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The (user_id, day) primary key doubles as the index for ranged time-series scans.
+    # Existing history is backfilled with `python rebuild_stats.py`.
+    op.create_table(
+        'user_daily_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('tasks_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('actual_minutes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('scheduled_seconds', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_daily_stats')
@@ -0,0 +1,28 @@
+"""Add per-user activity bitmap to user_stats
+
+Revision ID: 004_activity_bitmap
+Revises: 003_user_daily_stats
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '004_activity_bitmap'
+down_revision: Union[str, None] = '003_user_daily_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled from user_daily_stats by `python rebuild_stats.py`.
+    op.add_column('user_stats', sa.Column('activity_epoch', sa.Date(), nullable=True))
+    op.add_column('user_stats', sa.Column('activity_bitmap', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('user_stats', 'activity_bitmap')
+    op.drop_column('user_stats', 'activity_epoch')
@@ -0,0 +1,34 @@
+"""Mark generated schedule entries
+
+Revision ID: 005_schedule_is_generated
+Revises: 004_activity_bitmap
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '005_schedule_is_generated'
+down_revision: Union[str, None] = '004_activity_bitmap'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'schedules',
+        sa.Column('is_generated', sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+    # Until now every regeneration wiped the whole schedule, so the generator's own
+    # entries are recognisable by their break title or the "Blok n z m" description.
+    op.execute(
+        "UPDATE schedules SET is_generated = true "
+        "WHERE title = 'Przerwa' OR description LIKE 'Blok % z %'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('schedules', 'is_generated')
@@ -0,0 +1,61 @@
+"""Add indexes for the per-user hot paths
+
+Revision ID: 007_hot_path_indexes
+Revises: 006_jobs
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '007_hot_path_indexes'
+down_revision: Union[str, None] = '006_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns)
+INDEXES = [
+    # every task query is scoped through subjects.user_id
+    ('ix_subjects_user_id', 'subjects', ['user_id']),
+    # task list order (deadline, id) and the weekly deadline window, per subject
+    ('ix_tasks_subject_id_deadline', 'tasks', ['subject_id', 'deadline', 'id']),
+    # per-status counts (subject breakdown, rollup rebuilds)
+    ('ix_tasks_subject_id_status', 'tasks', ['subject_id', 'status']),
+    # schedule range listing; also replaces the single-column user_id index
+    ('ix_schedules_user_id_start_time', 'schedules', ['user_id', 'start_time']),
+    # foreign key checks when tasks or subjects are deleted
+    ('ix_schedules_task_id', 'schedules', ['task_id']),
+    ('ix_schedules_subject_id', 'schedules', ['subject_id']),
+]
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        # CONCURRENTLY does not block writes, but cannot run inside a transaction.
+        # If a build fails it leaves an INVALID index behind: drop it and rerun.
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index('ix_schedules_user_id', table_name='schedules', postgresql_concurrently=True, if_exists=True)
+        return
+
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    op.drop_index('ix_schedules_user_id', table_name='schedules')
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index('ix_schedules_user_id', 'schedules', ['user_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+            for name, table, columns in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        return
+
+    op.create_index('ix_schedules_user_id', 'schedules', ['user_id'], unique=False)
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
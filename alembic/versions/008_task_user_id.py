@@ -0,0 +1,90 @@
+"""Denormalize the owning user onto tasks
+
+Revision ID: 008_task_user_id
+Revises: 007_hot_path_indexes
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '008_task_user_id'
+down_revision: Union[str, None] = '007_hot_path_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL_BATCH_SIZE = 10000
+
+INDEXES = [
+    ('ix_tasks_user_id_deadline', 'tasks', ['user_id', 'deadline', 'id']),
+    ('ix_tasks_user_id_status_deadline', 'tasks', ['user_id', 'status', 'deadline']),
+]
+
+
+def upgrade() -> None:
+    postgresql = op.get_context().dialect.name == 'postgresql'
+
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_tasks_user_id_users', 'users', ['user_id'], ['id'])
+
+    # Backfill in id ranges; on PostgreSQL every batch commits on its own,
+    # so a large tasks table is never locked in one long transaction.
+    if postgresql:
+        with op.get_context().autocommit_block():
+            _backfill()
+    else:
+        _backfill()
+
+    mismatched = op.get_bind().execute(sa.text(
+        "SELECT count(*) FROM tasks JOIN subjects ON subjects.id = tasks.subject_id "
+        "WHERE tasks.user_id IS NULL OR tasks.user_id <> subjects.user_id"
+    )).scalar()
+    if mismatched:
+        raise RuntimeError(f"{mismatched} tasks do not match the owner of their subject after the backfill")
+
+    if postgresql:
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+            # the task list no longer reaches tasks through subjects
+            op.drop_index('ix_tasks_subject_id_deadline', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+        return
+
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    op.drop_index('ix_tasks_subject_id_deadline', table_name='tasks')
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text("SELECT max(id) FROM tasks")).scalar() or 0
+    for low in range(0, max_id, BACKFILL_BATCH_SIZE):
+        bind.execute(
+            sa.text(
+                "UPDATE tasks SET user_id = "
+                "(SELECT subjects.user_id FROM subjects WHERE subjects.id = tasks.subject_id) "
+                "WHERE tasks.id > :low AND tasks.id <= :high"
+            ),
+            {"low": low, "high": low + BACKFILL_BATCH_SIZE},
+        )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index('ix_tasks_subject_id_deadline', 'tasks', ['subject_id', 'deadline', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+            for name, table, columns in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        op.create_index('ix_tasks_subject_id_deadline', 'tasks', ['subject_id', 'deadline', 'id'], unique=False)
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
+
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_constraint('fk_tasks_user_id_users', type_='foreignkey')
+        batch_op.drop_column('user_id')
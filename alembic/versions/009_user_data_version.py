@@ -0,0 +1,29 @@
+"""Add a per-user data version for conditional GETs
+
+Revision ID: 009_user_data_version
+Revises: 008_task_user_id
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '009_user_data_version'
+down_revision: Union[str, None] = '008_task_user_id'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Starts at 1 so ETags handed out before the rollup row existed (version 0) never match.
+    op.add_column(
+        'user_stats',
+        sa.Column('data_version', sa.BigInteger(), nullable=False, server_default='1')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('user_stats', 'data_version')
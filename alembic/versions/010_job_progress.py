@@ -0,0 +1,25 @@
+"""Add progress reporting to jobs
+
+Revision ID: 010_job_progress
+Revises: 009_user_data_version
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '010_job_progress'
+down_revision: Union[str, None] = '009_user_data_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('progress', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'progress')
@@ -1,21 +1,140 @@
-from fastapi import Depends, HTTPException
+import hmac
+from datetime import datetime
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.config import SECRET_KEY, ALGORITHM
-from app.database.session import get_db
+from app.core.config import SECRET_KEY, ALGORITHM, DB_MODE, METRICS_TOKEN
+from app.core.user_cache import CachedUser, user_cache
+from app.database.routing import async_read_session_factory, read_session_factory
+from app.database.session import get_async_db, get_db
 from app.models.user import User
+from app.services.rollups import load_data_version, load_data_version_async
 
 security = HTTPBearer()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db=Depends(get_db)):
+def decode_token(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     token = credentials.credentials
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = int(payload.get("sub"))
-    except JWTError:
+        payload["sub"] = int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid token")
-    user = db.query(User).get(user_id)
+    # lets the write-tracking middleware attribute the request to a user
+    request.state.user_id = payload["sub"]
+    return payload
+
+def get_current_user(payload: dict = Depends(decode_token), db=Depends(get_db)) -> CachedUser:
+    """Authenticated user record; the database is only hit on a cache miss"""
+    user_id = payload["sub"]
+    user = user_cache.get(user_id)
+    if user is None:
+        row = db.get(User, user_id)
+        if not row:
+            raise HTTPException(status_code=401, detail="User not found")
+        user = CachedUser.from_row(row)
+        user_cache.put(user)
+    return user
+
+async def get_current_user_async(payload: dict = Depends(decode_token), db: AsyncSession = Depends(get_async_db)) -> CachedUser:
+    """get_current_user for async routes, so a cache miss does not leave the event loop"""
+    user_id = payload["sub"]
+    user = user_cache.get(user_id)
+    if user is None:
+        row = await db.get(User, user_id)
+        if not row:
+            raise HTTPException(status_code=401, detail="User not found")
+        user = CachedUser.from_row(row)
+        user_cache.put(user)
+    return user
+
+def get_read_db(payload: dict = Depends(decode_token)):
+    """Session for read-only routes: the replica unless it is unhealthy or the user just wrote"""
+    db: Session = read_session_factory(payload["sub"])()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(payload: dict = Depends(decode_token)):
+    db: AsyncSession = async_read_session_factory(payload["sub"])()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+def etag_for(user_id: int, version: int) -> str:
+    # the day is part of the tag: streaks and week windows change at midnight without a write
+    return f'W/"{user_id}-{version}-{datetime.utcnow().date().isoformat()}"'
+
+def _if_none_match(request: Request) -> set:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return set()
+    # weak comparison: W/"x" and "x" name the same version
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+def _conditional_get(request: Request, response: Response, user_id: int, version: int):
+    etag = etag_for(user_id, version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    candidates = _if_none_match(request)
+    if "*" in candidates or etag.removeprefix("W/") in candidates:
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return version
+
+def check_etag(request: Request, response: Response, payload: dict = Depends(decode_token), db: Session = Depends(get_read_db)):
+    """
+    Conditional GET for per-user data: answers 304 when If-None-Match carries the
+    current data version, after a single lookup on user_stats. Returns that
+    version; FastAPI caches it per request, so routes can depend on it again.
+    """
+    return _conditional_get(request, response, payload["sub"], load_data_version(db, payload["sub"]))
+
+async def check_etag_async(
+    request: Request,
+    response: Response,
+    payload: dict = Depends(decode_token),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return _conditional_get(request, response, payload["sub"], await load_data_version_async(db, payload["sub"]))
+
+# Read routes are defined once; DB_MODE picks the user lookup, session and
+# ETag check they depend on, and run_read the matching service variant.
+get_read_user = get_current_user_async if DB_MODE == "async" else get_current_user
+get_read_session = get_async_read_db if DB_MODE == "async" else get_read_db
+check_read_etag = check_etag_async if DB_MODE == "async" else check_etag
+
+async def run_read(db, service, service_async, *args, **kwargs):
+    """Await service_async on an AsyncSession; run the sync service in the threadpool otherwise"""
+    if isinstance(db, AsyncSession):
+        return await service_async(db, *args, **kwargs)
+    return await run_in_threadpool(service, db, *args, **kwargs)
+
+def get_token_user(payload: dict = Depends(decode_token)) -> CachedUser:
+    """Trust the signed claims (sub, role) and skip the user lookup entirely"""
+    return CachedUser(payload["sub"], role=payload.get("role") or "user")
+
+def get_current_user_row(payload: dict = Depends(decode_token), db: Session = Depends(get_db)) -> User:
+    """Full User row, for routes that need more than the cached fields"""
+    user = db.get(User, payload["sub"])
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     return user
+
+def require_admin(user: CachedUser = Depends(get_current_user)) -> CachedUser:
+    if user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
+
+def require_metrics_access(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+):
+    """Scrapers send METRICS_TOKEN as a bearer token; admins may use their own token"""
+    if METRICS_TOKEN and hmac.compare_digest(credentials.credentials.encode(), METRICS_TOKEN.encode()):
+        return
+    require_admin(get_current_user(decode_token(request, credentials), db))
@@ -0,0 +1,44 @@
+import os
+import shutil
+import tempfile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from sqlalchemy.orm import Session
+from app.api.dependency import get_current_user
+from app.api.profiling import ProfilingRoute
+from app.database.session import get_db
+from app.services import imports as import_service
+from app.services import jobs as job_service
+
+router = APIRouter(prefix="/import", tags=["Import"], route_class=ProfilingRoute)
+
+@router.post("/")
+def import_tasks(
+    response: Response,
+    file: UploadFile = File(...),
+    format: str | None = Query(None, pattern="^(csv|ndjson)$"),
+    run_async: bool = Query(False, alias="async"),
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    fmt = format or import_service.detect_format(file.filename, file.content_type)
+
+    if not run_async:
+        # the upload is spooled to disk past a small size, so this reads it in bounded memory
+        return import_service.import_tasks(db, user.id, file.file, fmt)
+
+    # the job outlives the request (and its upload), so it gets its own copy of the file
+    handle, path = tempfile.mkstemp(prefix="import-", suffix=f".{fmt}")
+    with os.fdopen(handle, "wb") as target:
+        shutil.copyfileobj(file.file, target)
+
+    job = job_service.submit_job(db, user.id, "import_tasks", {"path": path, "format": fmt})
+    if job.params.get("path") != path:
+        os.remove(path)
+        raise HTTPException(status_code=409, detail="Another import is still running")
+    response.status_code = 202
+    return {"job_id": job.id, "status": job.status}
+
+@router.get("/jobs/{job_id}")
+def get_import_job(job_id: int, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    job = job_service.get_job(db, job_id, user.id, kind="import_tasks")
+    return job_service.format_job_response(job)
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+from app.api.dependency import require_admin
+from app.core import metrics, profiling
+from app.core.user_cache import user_cache
+
+router = APIRouter(prefix="/monitoring", tags=["Monitoring"])
+
+@router.get("/stats")
+def get_stats(user=Depends(require_admin)):
+    return {
+        "user_cache": {
+            "size": len(user_cache),
+            "hits": metrics.REGISTRY["user_cache_hits_total"].value(),
+            "misses": metrics.REGISTRY["user_cache_misses_total"].value(),
+        },
+        "metrics": metrics.snapshot(),
+    }
+
+@router.get("/profiles")
+def list_profiles(user=Depends(require_admin)):
+    return profiling.list_profiles()
+
+@router.get("/profiles/{profile_id}")
+def get_profile(
+    profile_id: str,
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls|ncalls)$"),
+    limit: int = Query(50, ge=1, le=1000),
+    user=Depends(require_admin)
+):
+    meta = profiling.load_meta(profile_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {**meta, "stats": profiling.format_stats(profile_id, sort, limit)}
+
+@router.get("/profiles/{profile_id}/pstats")
+def download_pstats(profile_id: str, user=Depends(require_admin)):
+    """Raw cProfile data, for pstats.Stats or snakeviz"""
+    path = profiling.profile_path(profile_id, "pstats")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.pstats")
+
+@router.get("/profiles/{profile_id}/collapsed")
+def download_collapsed(profile_id: str, user=Depends(require_admin)):
+    """Sampled stacks in collapsed format, for flamegraph.pl or speedscope"""
+    path = profiling.profile_path(profile_id, "collapsed")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    with open(path) as f:
+        return PlainTextResponse(f.read())
@@ -0,0 +1,85 @@
+import functools
+import inspect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from jose import JWTError, jwt
+from starlette.requests import Request
+from app.core import profiling
+from app.core.config import ALGORITHM, SECRET_KEY
+from app.core.user_cache import CachedUser, user_cache
+from app.database.session import SessionLocal
+from app.models.user import User
+
+
+def _profile_requested(request: Request) -> bool:
+    flag = request.headers.get("x-profile") or request.query_params.get("profile")
+    return (flag or "").lower() in ("1", "true", "yes")
+
+
+def _admin_id(request: Request):
+    """Id of the authenticated user when they are an admin; the route still authenticates on its own"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        user_id = int(jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub"))
+    except (JWTError, TypeError, ValueError):
+        return None
+    user = user_cache.get(user_id)
+    if user is None:
+        with SessionLocal() as db:
+            row = db.get(User, user_id)
+            if row is None:
+                return None
+            user = CachedUser.from_row(row)
+        user_cache.put(user)
+    return user.id if user.role == "admin" else None
+
+
+class ProfilingRoute(APIRoute):
+    """
+    APIRoute that profiles a single request when an admin sends it with an
+    X-Profile: 1 header or ?profile=1. The profile id is returned in the
+    X-Profile-Id header; the profile is served under /monitoring/profiles.
+    Sync endpoints are profiled in their threadpool thread, async ones on
+    the event loop (which may also catch other requests' work). Requests
+    from other users, or sent while another profile runs, are not profiled.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        self.profile_on_loop = inspect.iscoroutinefunction(endpoint)
+        if not self.profile_on_loop:
+            endpoint = self._profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _profiled(endpoint):
+        @functools.wraps(endpoint)
+        def profiled_endpoint(*args, **kwargs):
+            return profiling.profiled_call(endpoint, *args, **kwargs)
+
+        return profiled_endpoint
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def profiling_handler(request: Request):
+            if not _profile_requested(request):
+                return await handler(request)
+            admin_id = await run_in_threadpool(_admin_id, request)
+            if admin_id is None:
+                return await handler(request)
+
+            with profiling.profiling(f"{request.method} {request.url.path}", admin_id) as profile:
+                if profile is None:
+                    return await handler(request)
+                if self.profile_on_loop:
+                    with profile.running():
+                        response = await handler(request)
+                else:
+                    response = await handler(request)
+                profile.status = response.status_code
+            response.headers["X-Profile-Id"] = profile.id
+            return response
+
+        return profiling_handler
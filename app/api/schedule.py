@@ -1,30 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from datetime import datetime
-from app.api.dependency import get_current_user
+from app.api.dependency import (
+    check_etag,
+    check_read_etag,
+    get_current_user,
+    get_read_db,
+    get_read_session,
+    get_read_user,
+    run_read,
+)
+from app.api.profiling import ProfilingRoute
+from app.core.responses import json_response
 from app.database.session import get_db
-from app.models.task import Task
-from app.models.subject import Subject
-from app.schemas.schedule import ScheduleCreate, ScheduleOut, ScheduleUpdate
+from app.schemas.schedule import ScheduleCreate, ScheduleList, ScheduleOut, ScheduleUpdate
+from app.services import jobs as job_service
 from app.services import schedule as schedule_service
 
-router = APIRouter(prefix="/schedule", tags=["Schedule"])
+router = APIRouter(prefix="/schedule", tags=["Schedule"], route_class=ProfilingRoute)
 
 @router.post("/", response_model=ScheduleOut)
 def create_schedule(schedule: ScheduleCreate, user=Depends(get_current_user), db: Session = Depends(get_db)):
     return schedule_service.create_schedule(db, user.id, schedule.model_dump())
 
-@router.get("/", response_model=list[ScheduleOut])
-def list_schedules(
+@router.get("/", response_model=list[ScheduleOut], dependencies=[Depends(check_read_etag)])
+async def list_schedules(
+    response: Response,
     start_date: datetime | None = Query(None),
     end_date: datetime | None = Query(None),
-    user=Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user=Depends(get_read_user),
+    db=Depends(get_read_session)
 ):
-    return schedule_service.list_user_schedules(db, user.id, start_date, end_date)
+    schedules = await run_read(
+        db, schedule_service.list_user_schedules, schedule_service.list_user_schedules_async,
+        user.id, start_date, end_date
+    )
+    return json_response(schedules, response, ScheduleList)
 
-@router.get("/{schedule_id}", response_model=ScheduleOut)
-def get_schedule(schedule_id: int, user=Depends(get_current_user), db: Session = Depends(get_db)):
+@router.get("/{schedule_id}", response_model=ScheduleOut, dependencies=[Depends(check_etag)])
+def get_schedule(schedule_id: int, user=Depends(get_current_user), db: Session = Depends(get_read_db)):
     return schedule_service.get_schedule_by_id(db, schedule_id, user.id)
 
 @router.put("/{schedule_id}", response_model=ScheduleOut)
@@ -42,6 +56,7 @@ def delete_schedule(schedule_id: int, user=Depends(get_current_user), db: Sessio
 
 @router.post("/generate")
 def generate_schedule(
+    response: Response,
     user=Depends(get_current_user), 
     db: Session = Depends(get_db),
     end_date: datetime | None = Query(None),
@@ -49,24 +64,34 @@ def generate_schedule(
     medium_break_minutes: int = Query(15),
     long_break_minutes: int = Query(30),
     long_break_after_minutes: int = Query(90),
+    day_start_hour: int = Query(9, ge=0, le=23),
+    day_end_hour: int = Query(18, ge=1, le=24),
+    run_async: bool = Query(False, alias="async"),
 ):
-    from app.services.scheduler import generate_schedule_from_tasks
+    if day_start_hour >= day_end_hour:
+        raise HTTPException(400, "Working day must start before it ends")
     
-    tasks = db.query(Task).join(Subject).filter(Subject.user_id == user.id).all()
-    if not tasks:
-        raise HTTPException(400, "No tasks found to schedule")
+    options = {
+        "end_date": end_date,
+        "short_break_minutes": short_break_minutes,
+        "medium_break_minutes": medium_break_minutes,
+        "long_break_minutes": long_break_minutes,
+        "long_break_after_minutes": long_break_after_minutes,
+        "day_start_hour": day_start_hour,
+        "day_end_hour": day_end_hour,
+    }
     
-    schedule_service.clear_user_schedules(db, user.id)
+    options["end_date"] = end_date.isoformat() if end_date else None
+    if run_async:
+        job = job_service.submit_job(db, user.id, "generate_schedule", options)
+        response.status_code = 202
+        return {"job_id": job.id, "status": job.status}
     
-    schedule_entries = generate_schedule_from_tasks(
-        tasks, 
-        user.id,
-        end_date=end_date,
-        short_break_minutes=short_break_minutes,
-        medium_break_minutes=medium_break_minutes,
-        long_break_minutes=long_break_minutes,
-        long_break_after_minutes=long_break_after_minutes,
-    )
-    
-    schedule_service.create_schedules_from_tasks(db, user.id, schedule_entries)
-    return {"message": "Schedule generated successfully", "entries_created": len(schedule_entries)}
+    # runs as a job too, so it cannot overlap a background generation
+    result = job_service.run_job_now(db, user.id, "generate_schedule", options)
+    return {"message": "Schedule generated successfully", **result}
+
+@router.get("/jobs/{job_id}")
+def get_generate_job(job_id: int, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    job = job_service.get_job(db, job_id, user.id, kind="generate_schedule")
+    return job_service.format_job_response(job)
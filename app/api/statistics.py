@@ -1,30 +1,61 @@
-from fastapi import APIRouter, Depends
-from app.api.dependency import get_current_user
-from app.database.session import get_db
-from app.services.stats import (
-    get_user_statistics,
-    get_weekly_progress,
-    get_subject_breakdown,
-    completion_percentage
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, Query
+from app.api.dependency import check_read_etag, get_read_session, get_read_user, run_read
+from app.api.profiling import ProfilingRoute
+from app.services import stats as stats_service
+from app.services import stats_cache
+
+router = APIRouter(
+    prefix="/statistics",
+    tags=["Statistics"],
+    route_class=ProfilingRoute,
+    dependencies=[Depends(check_read_etag)],
 )
-from app.models.subject import Subject
-from app.models.task import Task
 
-router = APIRouter(prefix="/statistics", tags=["Statistics"])
+def _range(start: date | None, end: date | None, days: int):
+    end = end or datetime.utcnow().date()
+    return start or end - timedelta(days=days - 1), end
+
+def _cached(db, endpoint: str, user_id: int, version: int):
+    return run_read(db, stats_cache.get_cached, stats_cache.get_cached_async, endpoint, user_id, version)
 
 @router.get("/")
-def get_statistics(user=Depends(get_current_user), db=Depends(get_db)):
-    return get_user_statistics(db, user.id)
+async def get_statistics(user=Depends(get_read_user), db=Depends(get_read_session), version: int = Depends(check_read_etag)):
+    return await _cached(db, "overview", user.id, version)
 
 @router.get("/weekly")
-def get_weekly_stats(user=Depends(get_current_user), db=Depends(get_db)):
-    return get_weekly_progress(db, user.id)
+async def get_weekly_stats(user=Depends(get_read_user), db=Depends(get_read_session), version: int = Depends(check_read_etag)):
+    return await _cached(db, "weekly", user.id, version)
+
+@router.get("/timeseries")
+async def get_timeseries(
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    granularity: str = Query("day", pattern="^(day|week|month)$"),
+    user=Depends(get_read_user),
+    db=Depends(get_read_session)
+):
+    return await run_read(
+        db, stats_service.get_time_series, stats_service.get_time_series_async,
+        user.id, *_range(start, end, 30), granularity
+    )
+
+@router.get("/heatmap")
+async def get_heatmap(
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    user=Depends(get_read_user),
+    db=Depends(get_read_session)
+):
+    return await run_read(
+        db, stats_service.get_activity_heatmap, stats_service.get_activity_heatmap_async,
+        user.id, *_range(start, end, 365)
+    )
 
 @router.get("/subjects")
-def get_subject_stats(user=Depends(get_current_user), db=Depends(get_db)):
-    return get_subject_breakdown(db, user.id)
+async def get_subject_stats(user=Depends(get_read_user), db=Depends(get_read_session), version: int = Depends(check_read_etag)):
+    return await _cached(db, "subjects", user.id, version)
 
 @router.get("/completion")
-def completion(user=Depends(get_current_user), db=Depends(get_db)):
-    tasks = db.query(Task).join(Subject).filter(Subject.user_id == user.id).all()
-    return {"completion_percent": completion_percentage(tasks)}
+async def completion(user=Depends(get_read_user), db=Depends(get_read_session), version: int = Depends(check_read_etag)):
+    return {"completion_percent": await _cached(db, "completion", user.id, version)}
@@ -1,19 +1,29 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
-from app.api.dependency import get_current_user
+from app.api.dependency import check_etag, get_current_user, get_read_db
+from app.api.profiling import ProfilingRoute
+from app.core.responses import json_response
 from app.database.session import get_db
-from app.schemas.subject import SubjectCreate, SubjectOut
+from app.schemas.subject import SubjectCreate, SubjectList, SubjectOut, SubjectWithStats, SubjectWithStatsList
 from app.services import subjects as subject_service
 
-router = APIRouter(prefix="/subjects", tags=["Subjects"])
+router = APIRouter(prefix="/subjects", tags=["Subjects"], route_class=ProfilingRoute)
 
 @router.post("/", response_model=SubjectOut)
 def create_subject(subject: SubjectCreate, user=Depends(get_current_user), db: Session = Depends(get_db)):
     return subject_service.create_subject(db, user.id, subject.name, subject.description)
 
-@router.get("/", response_model=list[SubjectOut])
-def list_subjects(user=Depends(get_current_user), db: Session = Depends(get_db)):
-    return subject_service.get_user_subjects(db, user.id)
+@router.get("/", response_model=None, dependencies=[Depends(check_etag)])
+def list_subjects(
+    response: Response,
+    with_stats: bool = Query(False),
+    user=Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+) -> list[SubjectOut] | list[SubjectWithStats]:
+    # the two shapes differ only by the counters, so pick the adapter instead of validating a union
+    if with_stats:
+        return json_response(subject_service.get_user_subjects_with_stats(db, user.id), response, SubjectWithStatsList)
+    return json_response(subject_service.get_user_subjects(db, user.id), response, SubjectList)
 
 @router.put("/{subject_id}")
 def update_subject(subject_id: int, data: SubjectCreate, user=Depends(get_current_user), db: Session = Depends(get_db)):
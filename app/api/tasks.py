@@ -1,40 +1,122 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.api.dependency import get_current_user
+from app.api.dependency import (
+    check_etag,
+    check_read_etag,
+    get_current_user,
+    get_read_db,
+    get_read_session,
+    get_read_user,
+    run_read,
+)
+from app.api.profiling import ProfilingRoute
+from app.core.config import TASK_PAGE_MAX, TASK_PAGE_SIZE
+from app.core.responses import json_response
+from app.database.routing import read_session_factory
 from app.database.session import get_db
-from app.schemas.task import TaskCreate, TaskUpdate, TaskComplete
+from app.schemas.task import (
+    TaskBatchCreate,
+    TaskBatchResult,
+    TaskBatchUpdate,
+    TaskComplete,
+    TaskCreate,
+    TaskOut,
+    TaskUpdate,
+    TaskWithSubject,
+)
 from app.services import tasks as task_service
 
-router = APIRouter(prefix="/tasks", tags=["Tasks"])
+router = APIRouter(prefix="/tasks", tags=["Tasks"], route_class=ProfilingRoute)
 
-@router.post("/")
+@router.post("/", response_model=TaskOut)
 def create_task(task: TaskCreate, user=Depends(get_current_user), db: Session = Depends(get_db)):
     return task_service.create_task(db, user.id, task.model_dump())
 
-@router.get("/")
-def list_tasks(status: str | None = None, user=Depends(get_current_user), db: Session = Depends(get_db)):
-    return task_service.list_user_tasks(db, user.id, status)
+@router.post("/batch", response_model=TaskBatchResult)
+def create_tasks_batch(batch: TaskBatchCreate, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    return task_service.create_tasks_batch(db, user.id, [item.model_dump() for item in batch.items])
+
+@router.patch("/batch", response_model=TaskBatchResult)
+def update_tasks_batch(batch: TaskBatchUpdate, user=Depends(get_current_user), db: Session = Depends(get_db)):
+    return task_service.update_tasks_batch(db, user.id, [item.model_dump(exclude_unset=True) for item in batch.items])
+
+def _task_list_params(
+    status: str | None = None,
+    subject_id: int | None = None,
+    priority: str | None = None,
+    deadline_from: datetime | None = None,
+    deadline_to: datetime | None = None,
+    limit: int = Query(TASK_PAGE_SIZE, ge=1, le=TASK_PAGE_MAX),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated list of columns to return"),
+):
+    return {
+        "status": status,
+        "subject_id": subject_id,
+        "priority": priority,
+        "deadline_from": deadline_from,
+        "deadline_to": deadline_to,
+        "limit": limit,
+        "cursor": cursor,
+        "fields": fields,
+    }
+
+def _task_list_response(response: Response, tasks, next_cursor):
+    # the body stays a plain list; the next page is advertised in a header.
+    # rows are plain dicts already, so they are dumped without a validation pass
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(tasks, response)
+
+@router.get("/", dependencies=[Depends(check_read_etag)])
+async def list_tasks(
+    response: Response,
+    params: dict = Depends(_task_list_params),
+    user=Depends(get_read_user),
+    db=Depends(get_read_session)
+):
+    tasks, next_cursor = await run_read(
+        db, task_service.list_user_tasks, task_service.list_user_tasks_async, user.id, **params
+    )
+    return _task_list_response(response, tasks, next_cursor)
+
+EXPORT_FORMATS = {
+    "csv": (task_service.export_tasks_csv, "text/csv", "tasks.csv"),
+    "ndjson": (task_service.export_tasks_ndjson, "application/x-ndjson", "tasks.ndjson"),
+}
 
 @router.get("/csv")
-def export_csv(user=Depends(get_current_user), db: Session = Depends(get_db)):
-    csv_content = task_service.export_tasks_csv(db, user.id)
+def export_csv(format: str = Query("csv", pattern="^(csv|ndjson)$"), user=Depends(get_current_user)):
+    export, media_type, filename = EXPORT_FORMATS[format]
+    user_id = user.id
+    session_factory = read_session_factory(user_id)
     
     def generate():
-        yield csv_content
+        # the stream outlives the request scope, so it owns its session
+        db = session_factory()
+        try:
+            yield from export(db, user_id)
+        finally:
+            db.close()
     
-    return StreamingResponse(generate(), media_type="text/csv")
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
-@router.get("/{task_id}")
-def get_task(task_id: int, user=Depends(get_current_user), db: Session = Depends(get_db)):
-    task = task_service.get_task_by_id(db, task_id, user.id)
+@router.get("/{task_id}", response_model=TaskWithSubject, dependencies=[Depends(check_etag)])
+def get_task(task_id: int, user=Depends(get_current_user), db: Session = Depends(get_read_db)):
+    task = task_service.get_task_with_subject(db, task_id, user.id)
     return task_service.format_task_response(task)
 
-@router.put("/{task_id}")
+@router.put("/{task_id}", response_model=TaskOut)
 def update_task(task_id: int, task_update: TaskUpdate, user=Depends(get_current_user), db: Session = Depends(get_db)):
     return task_service.update_task(db, task_id, user.id, task_update.model_dump(exclude_unset=True))
 
-@router.post("/{task_id}/complete")
+@router.post("/{task_id}/complete", response_model=TaskOut)
 def complete_task(task_id: int, complete_data: TaskComplete, user=Depends(get_current_user), db: Session = Depends(get_db)):
     return task_service.complete_task(db, task_id, user.id, complete_data.actual_minutes)
 
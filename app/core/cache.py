@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Cache backends keyed by (user_id, *parts). Nothing is invalidated in place:
+# callers put the user's data version in the key (see app/services/stats_cache.py),
+# so a write makes the older entries unreachable and they age out.
+
+
+class CacheBackend:
+    def get(self, key: tuple):
+        raise NotImplementedError
+
+    def set(self, key: tuple, value, ttl: float):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class NullBackend(CacheBackend):
+    """Caching disabled"""
+
+    def get(self, key: tuple):
+        return None
+
+    def set(self, key: tuple, value, ttl: float):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUBackend(CacheBackend):
+    """Per-process LRU with a time-to-live per entry"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: tuple, value, ttl: float):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _remove(self, key: tuple):
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedBackend(CacheBackend):
+    """
+    Cache shared by all processes, on top of a key-value store with TTLs
+    (Redis, Memcached, ...). Values are stored as JSON.
+    """
+
+    def __init__(self, store, namespace: str = "cache"):
+        self.store = store
+        self.namespace = namespace
+
+    def _key(self, key: tuple) -> str:
+        return f"{self.namespace}:" + ":".join(str(part) for part in key)
+
+    def get(self, key: tuple):
+        raw = self.store.get(self._key(key))
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: tuple, value, ttl: float):
+        self.store.set(self._key(key), json.dumps(value, default=str), ttl)
+
+    def clear(self):
+        self.store.flush()
+
+
+class DictStore:
+    """In-memory stand-in for a shared key-value store, for development and tests"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value, ttl: float = None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl if ttl else None, value)
+
+    def flush(self):
+        with self._lock:
+            self._data.clear()
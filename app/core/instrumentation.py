@@ -0,0 +1,121 @@
+import time
+from sqlalchemy import event
+from app.core.metrics import Counter, Gauge, Histogram, register_collector
+from app.core.tracing import record_statement
+
+# Request, SQL and connection pool metrics. Every hook does a clock read and
+# a dict update under a lock, cheap enough to stay on in production.
+
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+http_requests = Counter("http_requests_total", "HTTP requests by route template and status", ["method", "route", "status"])
+http_latency = Histogram("http_request_duration_seconds", "HTTP request latency until the last body byte, by route template", ["method", "route"])
+http_in_flight = Gauge("http_requests_in_flight", "HTTP requests being processed")
+
+db_statements = Counter("db_statements_total", "SQL statements executed", ["engine", "operation"])
+db_statement_latency = Histogram("db_statement_duration_seconds", "SQL statement execution time", ["engine", "operation"], buckets=FAST_BUCKETS)
+db_statement_errors = Counter("db_statement_errors_total", "SQL statements that raised", ["engine"])
+db_pool_checkout = Histogram("db_pool_checkout_seconds", "Time to get a connection from the pool, including waiting and connecting", ["engine"], buckets=FAST_BUCKETS)
+db_pool_overflow_checkouts = Counter("db_pool_overflow_checkouts_total", "Checkouts served while the pool was beyond pool_size", ["engine"])
+db_pool_size = Gauge("db_pool_size", "Configured pool size", ["engine"])
+db_pool_checked_out = Gauge("db_pool_checked_out", "Connections currently checked out", ["engine"])
+db_pool_overflow = Gauge("db_pool_overflow", "Connections open beyond pool_size", ["engine"])
+
+OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK"}
+
+_STARTS = "metrics_statement_starts"
+
+
+def _operation(statement: str) -> str:
+    word = statement.lstrip()[:8].split(None, 1)
+    operation = word[0].upper() if word else ""
+    return operation if operation in OPERATIONS else "OTHER"
+
+
+def instrument_engine(engine, name: str):
+    """
+    Count and time the statements of a (sync) engine and its pool checkouts;
+    for an AsyncEngine pass its .sync_engine. The pool hook is installed on the
+    current pool, so call this again after engine.dispose().
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_STARTS, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_STARTS)
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        operation = _operation(statement)
+        db_statements.inc(engine=name, operation=operation)
+        db_statement_latency.observe(elapsed, engine=name, operation=operation)
+        record_statement(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get(_STARTS) if context.connection is not None else None
+        if starts:
+            starts.pop()
+        db_statement_errors.inc(engine=name)
+
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        connection = connect()
+        db_pool_checkout.observe(time.perf_counter() - started, engine=name)
+        if getattr(pool, "overflow", None) and pool.overflow() > 0:
+            db_pool_overflow_checkouts.inc(engine=name)
+        return connection
+
+    pool.connect = timed_connect
+
+    @register_collector
+    def collect_pool():
+        # only QueuePool-like pools report sizes (NullPool/StaticPool do not)
+        current = engine.pool
+        if not hasattr(current, "checkedout"):
+            return
+        db_pool_size.set(current.size(), engine=name)
+        db_pool_checked_out.set(current.checkedout(), engine=name)
+        # overflow() counts up from -pool_size
+        db_pool_overflow.set(max(current.overflow(), 0), engine=name)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording in-flight requests, status counts and latency
+    per route template (not per raw path, to keep label cardinality bounded).
+    Latency runs until the response is fully sent, streaming bodies included.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_in_flight.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc(method=method, route=route, status=status)
+            http_latency.observe(time.perf_counter() - started, method=method, route=route)
@@ -0,0 +1,151 @@
+import threading
+from bisect import bisect_left
+
+# Minimal in-process metrics. Each metric keeps its samples per label set;
+# everything registered here is readable through snapshot() and render().
+
+REGISTRY = {}
+
+# callables run before each read, for gauges sampled on demand (pool sizes, ...)
+COLLECTORS = []
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY[name] = self
+
+    def _key(self, labels: dict):
+        return tuple(str(labels.get(label, "")) for label in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            # values above the last bound only show up in count (the +Inf bucket)
+            i = bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                state["counts"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, {"counts": list(s["counts"]), "sum": s["sum"], "count": s["count"]}) for key, s in self._values.items()]
+        return [(dict(zip(self.labelnames, key)), state) for key, state in items]
+
+
+def register_collector(fn):
+    COLLECTORS.append(fn)
+    return fn
+
+
+def collect():
+    for fn in COLLECTORS:
+        fn()
+
+
+def snapshot():
+    """All metrics as plain data, for JSON monitoring endpoints"""
+    collect()
+    return {
+        name: {
+            "type": metric.kind,
+            "help": metric.documentation,
+            "samples": [{"labels": labels, "value": value} for labels, value in metric.samples()],
+        }
+        for name, metric in REGISTRY.items()
+    }
+
+
+def _escape(value: str, quotes: bool = True) -> str:
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quotes else value
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+    collect()
+    lines = []
+    for name, metric in REGISTRY.items():
+        lines.append(f"# HELP {name} {_escape(metric.documentation, quotes=False)}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for labels, value in metric.samples():
+            if metric.kind != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            # stored per bucket; the format wants cumulative counts per upper bound
+            cumulative = 0
+            for bound, count in zip(metric.buckets, value["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': _number(float(bound))})} {cumulative}")
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {value['count']}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,215 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from app.core.config import PROFILE_DIR, PROFILE_KEEP, PROFILE_SAMPLE_INTERVAL_MS
+
+# On-demand profiling of single requests (see app/api/profiling.py). A profile
+# pairs cProfile's exact call counts with a sampler that records the profiled
+# thread's stack every few milliseconds as collapsed stacks, the input of
+# flamegraph.pl and speedscope. Profiles are written to PROFILE_DIR so that
+# any worker process on the host can serve them.
+
+PROFILE_KINDS = {"pstats": ".pstats", "collapsed": ".folded", "meta": ".json"}
+
+_ID = re.compile(r"^[0-9a-f]{16}$")
+
+# the profile of the request being handled, if any (follows it into the threadpool)
+_current = ContextVar("request_profile", default=None)
+
+# one profiled request at a time per process: cProfile hooks are per thread
+# and a second profile would blur the first one's timings
+_lock = threading.Lock()
+
+
+def _frame_name(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_name}"
+
+
+def collapse_stack(frame) -> str:
+    """The stack ending at frame as "outer;...;inner", the collapsed-stack format"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Sampler(threading.Thread):
+    """Counts the stacks of one thread, sampled every `interval` seconds"""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+                self.samples += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+class RequestProfile:
+    def __init__(self, name: str, user_id: int):
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.user_id = user_id
+        self.created_at = datetime.utcnow()
+        self.seconds = 0.0
+        self.status = None
+        self.profiler = cProfile.Profile()
+        self.stacks = Counter()
+        self.samples = 0
+
+    @contextmanager
+    def running(self):
+        """Profile and sample the calling thread for the duration of the block"""
+        sampler = Sampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        sampler.start()
+        started = time.perf_counter()
+        self.profiler.enable()
+        try:
+            yield
+        finally:
+            self.profiler.disable()
+            self.seconds += time.perf_counter() - started
+            sampler.stop()
+            self.stacks.update(sampler.stacks)
+            self.samples += sampler.samples
+
+    def meta(self) -> dict:
+        return {
+            "id": self.id,
+            "request": self.name,
+            "user_id": self.user_id,
+            "created_at": self.created_at.isoformat(),
+            "seconds": round(self.seconds, 6),
+            "status": self.status,
+            "samples": self.samples,
+            "sample_interval_ms": PROFILE_SAMPLE_INTERVAL_MS,
+        }
+
+
+@contextmanager
+def profiling(name: str, user_id: int):
+    """
+    Yield a RequestProfile made current for the block, or None when another
+    request is being profiled. The profile is saved when the block exits.
+    """
+    if not _lock.acquire(blocking=False):
+        yield None
+        return
+    profile = RequestProfile(name, user_id)
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+        try:
+            save_profile(profile)
+        finally:
+            _lock.release()
+
+
+def profiled_call(fn, *args, **kwargs):
+    """Call fn, under the current request's profile when there is one"""
+    profile = _current.get()
+    if profile is None:
+        return fn(*args, **kwargs)
+    with profile.running():
+        return fn(*args, **kwargs)
+
+
+def _path(profile_id: str, kind: str) -> str:
+    return os.path.join(PROFILE_DIR, profile_id + PROFILE_KINDS[kind])
+
+
+def save_profile(profile: RequestProfile):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile.profiler.create_stats()
+    profile.profiler.dump_stats(_path(profile.id, "pstats"))
+    with open(_path(profile.id, "collapsed"), "w") as f:
+        for stack, count in profile.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    # the metadata goes last: a profile is listed once it is complete
+    with open(_path(profile.id, "meta"), "w") as f:
+        json.dump(profile.meta(), f)
+    _prune()
+
+
+def _prune():
+    metas = sorted(
+        (entry for entry in os.scandir(PROFILE_DIR) if entry.name.endswith(PROFILE_KINDS["meta"])),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in metas[PROFILE_KEEP:]:
+        profile_id = entry.name[:-len(PROFILE_KINDS["meta"])]
+        for kind in PROFILE_KINDS:
+            try:
+                os.remove(_path(profile_id, kind))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> list:
+    """Metadata of the stored profiles, newest first"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        if name.endswith(PROFILE_KINDS["meta"]):
+            meta = load_meta(name[:-len(PROFILE_KINDS["meta"])])
+            if meta is not None:
+                profiles.append(meta)
+    return sorted(profiles, key=lambda meta: meta["created_at"], reverse=True)
+
+
+def profile_path(profile_id: str, kind: str):
+    """Path of a stored profile file, or None for an unknown id"""
+    if not _ID.match(profile_id) or kind not in PROFILE_KINDS:
+        return None
+    path = _path(profile_id, kind)
+    return path if os.path.exists(path) else None
+
+
+def load_meta(profile_id: str):
+    path = profile_path(profile_id, "meta")
+    if path is None:
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def format_stats(profile_id: str, sort: str = "cumulative", limit: int = 50):
+    """pstats report of a stored profile, or None for an unknown id"""
+    path = profile_path(profile_id, "pstats")
+    if path is None:
+        return None
+    out = io.StringIO()
+    stats = pstats.Stats(path, stream=out)
+    stats.sort_stats(sort).print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,33 @@
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.core.tracing import timed_serialization
+
+
+class ORJSONResponse(JSONResponse):
+    """Default response class: renders with orjson instead of json.dumps"""
+
+    def render(self, content) -> bytes:
+        with timed_serialization():
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(content, response: Response = None, adapter: TypeAdapter = None, status_code: int = 200) -> Response:
+    """
+    Serialize straight to JSON bytes, skipping FastAPI's jsonable_encoder pass.
+    Plain data (dicts, lists, datetimes, enums) goes through orjson; with a
+    pre-built TypeAdapter, rows (ORM objects or dicts) are validated and dumped
+    to bytes in one pass of the compiled schema. Headers set by dependencies on
+    `response` are carried over, since FastAPI does not merge them into
+    responses returned by the route.
+    """
+    with timed_serialization():
+        if adapter is not None:
+            body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+        else:
+            body = orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    result = Response(content=body, status_code=status_code, media_type="application/json")
+    if response is not None:
+        result.headers.raw.extend(response.headers.raw)
+    return result
@@ -1,16 +1,112 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from jose import jwt
 from passlib.context import CryptContext
-from app.core.config import SECRET_KEY, ALGORITHM
+from app.core.config import (
+    SECRET_KEY,
+    ALGORITHM,
+    BCRYPT_ROUNDS,
+    HASH_WORKERS,
+    HASH_MAX_PENDING,
+    HASH_RETRY_AFTER_SECONDS,
+)
+from app.core.metrics import Counter, Gauge, Histogram
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
-def hash_pwd(pwd: str):
+hash_latency = Histogram("password_hash_seconds", "Time spent hashing/verifying passwords, including queueing", ["op"])
+hash_in_flight = Gauge("password_hash_in_flight", "Password hash operations queued or running")
+hash_rejected = Counter("password_hash_rejected_total", "Password hash operations rejected because the pool was saturated")
+
+# bcrypt runs in its own processes so it does not hold the GIL, and the auth
+# routes await it (the *_async helpers) so waiting does not tie up a request
+# thread either; at most HASH_MAX_PENDING operations may wait for it
+_slots = threading.BoundedSemaphore(max(HASH_MAX_PENDING, 1))
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def _hash(pwd: str) -> str:
     return pwd_context.hash(pwd)
 
-def verify_pwd(pwd, hashed):
+
+def _verify(pwd: str, hashed: str) -> bool:
     return pwd_context.verify(pwd, hashed)
 
+
+def _verify_and_update(pwd: str, hashed: str):
+    return pwd_context.verify_and_update(pwd, hashed)
+
+
+@contextmanager
+def _hash_slot(op: str):
+    if not _slots.acquire(blocking=False):
+        hash_rejected.inc()
+        raise HTTPException(
+            status_code=503,
+            detail="Too many authentication requests, please retry shortly",
+            headers={"Retry-After": str(HASH_RETRY_AFTER_SECONDS)},
+        )
+
+    hash_in_flight.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        hash_latency.observe(time.perf_counter() - started, op=op)
+        hash_in_flight.dec()
+        _slots.release()
+
+
+def _run(op: str, fn, *args):
+    with _hash_slot(op):
+        if HASH_WORKERS <= 0:
+            return fn(*args)
+        return _get_executor().submit(fn, *args).result()
+
+
+async def _run_async(op: str, fn, *args):
+    with _hash_slot(op):
+        if HASH_WORKERS <= 0:
+            return await run_in_threadpool(fn, *args)
+        return await asyncio.wrap_future(_get_executor().submit(fn, *args))
+
+
+def hash_pwd(pwd: str):
+    return _run("hash", _hash, pwd)
+
+def verify_pwd(pwd, hashed):
+    return _run("verify", _verify, pwd, hashed)
+
+def verify_and_update_pwd(pwd, hashed):
+    """Verify a password; also returns a new hash when the stored one uses outdated settings"""
+    return _run("verify", _verify_and_update, pwd, hashed)
+
+async def hash_pwd_async(pwd: str):
+    return await _run_async("hash", _hash, pwd)
+
+async def verify_and_update_pwd_async(pwd, hashed):
+    return await _run_async("verify", _verify_and_update, pwd, hashed)
+
 def create_access_token(data: dict, expires_minutes: int):
     to_encode = data.copy()
     expire = datetime.now() + timedelta(minutes=expires_minutes)
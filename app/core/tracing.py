@@ -0,0 +1,148 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from app.core.config import SQL_REPEAT_WARNING_THRESHOLD, SQL_TRACE_ENABLED
+
+logger = logging.getLogger(__name__)
+
+# Per-request SQL tracing. The engine hooks in app/core/instrumentation.py
+# report every statement to the trace of the current request (a context
+# variable, so it follows the request into the threadpool and async greenlets).
+
+_current = ContextVar("sql_trace", default=None)
+
+# callables receiving every finished request trace (see assert_max_queries)
+_observers = []
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+))*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    """The statement with literals and IN-lists collapsed, to group repeats"""
+    normalized = _STRING.sub("?", statement)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?)", normalized)
+    return _SPACE.sub(" ", normalized).strip()
+
+
+class RequestTrace:
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.queries += 1
+        self.db_seconds += seconds
+        self.statements[normalize_statement(statement)] += 1
+
+    def repeated(self, threshold: int):
+        return [(sql, count) for sql, count in self.statements.most_common() if count > threshold]
+
+    def server_timing(self, total: float) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries", '
+            f"serialize;dur={self.serialize_seconds * 1000:.1f}, "
+            f"total;dur={total * 1000:.1f}"
+        )
+
+
+def record_statement(statement: str, seconds: float):
+    trace = _current.get()
+    if trace is not None:
+        trace.record(statement, seconds)
+
+
+@contextmanager
+def timed_serialization():
+    """Count the enclosed block as response serialization time"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.serialize_seconds += time.perf_counter() - started
+
+
+class SQLTraceMiddleware:
+    """
+    ASGI middleware tracing the SQL of each request: adds a Server-Timing
+    header (db, serialize, total) and logs a warning when one normalized
+    statement runs more than SQL_REPEAT_WARNING_THRESHOLD times, the usual
+    sign of an N+1 query. Streamed bodies are timed up to the first byte.
+    """
+
+    def __init__(self, app, threshold: int = None):
+        self.app = app
+        self.threshold = SQL_REPEAT_WARNING_THRESHOLD if threshold is None else threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not SQL_TRACE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(f"{scope['method']} {scope['path']}")
+        token = _current.set(trace)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - trace.started
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing(total).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self.finish(trace)
+
+    def finish(self, trace: RequestTrace):
+        for sql, count in trace.repeated(self.threshold):
+            logger.warning("Possible N+1: statement ran %d times in %s: %s", count, trace.name, sql[:300])
+        for observer in list(_observers):
+            observer(trace)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """
+    Fail when a request (or, without requests, the block itself) runs more
+    than `limit` SQL statements. Works with TestClient calls and with direct
+    service calls:
+
+        with assert_max_queries(3):
+            client.get("/tasks/", headers=auth)
+    """
+    captured = []
+    local = RequestTrace("block")
+    token = _current.set(local)
+    _observers.append(captured.append)
+    try:
+        yield captured
+    finally:
+        _observers.remove(captured.append)
+        _current.reset(token)
+
+    over = [t for t in (captured or [local]) if t.queries > limit]
+    if over:
+        details = "\n".join(
+            f"{t.name}: {t.queries} queries\n" + "\n".join(f"  {count}x {sql}" for sql, count in t.statements.most_common())
+            for t in over
+        )
+        raise AssertionError(f"Expected at most {limit} queries per request\n{details}")
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+from app.core.config import USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS
+from app.core.metrics import Counter
+
+user_cache_hits = Counter("user_cache_hits_total", "Authenticated user lookups served from the cache")
+user_cache_misses = Counter("user_cache_misses_total", "Authenticated user lookups that went to the database")
+
+
+class CachedUser:
+    """Lightweight stand-in for the User row, enough for authorization and /auth/me"""
+    __slots__ = ("id", "email", "username", "role")
+
+    def __init__(self, id: int, email: str = None, username: str = None, role: str = "user"):
+        self.id = id
+        self.email = email
+        self.username = username
+        self.role = role
+
+    @classmethod
+    def from_row(cls, user):
+        return cls(user.id, user.email, user.username, user.role)
+
+
+class UserCache:
+    """Thread-safe LRU of CachedUser records with a time-to-live"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                user_cache_hits.inc()
+                return entry[1]
+            if entry is not None:
+                del self._entries[user_id]
+        user_cache_misses.inc()
+        return None
+
+    def put(self, user: CachedUser):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
@@ -0,0 +1,49 @@
+import csv
+import enum
+import io
+from datetime import date, datetime
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+
+def _copy_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def copy_rows(db: Session, model, rows: list):
+    """COPY the rows into the model's table through the session's psycopg2 connection"""
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[c]) for c in columns])
+    buffer.seek(0)
+    cursor = db.connection().connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {model.__table__.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def bulk_insert(db: Session, model, rows: list):
+    """
+    Insert rows (dicts with the same keys) in as few round trips as possible:
+    COPY on Postgres through psycopg2, a multi-row INSERT elsewhere. COPY skips
+    Python-side column defaults, so rows must carry every value they need, and
+    empty strings load as NULL.
+    """
+    if not rows:
+        return
+    if db.get_bind().dialect.driver == "psycopg2":
+        copy_rows(db, model, rows)
+    else:
+        # Core insert of the table: the ORM variant splits rows into one statement
+        # per run of rows with the same NULL columns
+        db.execute(insert(model.__table__), rows)
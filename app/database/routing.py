@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+from sqlalchemy import text
+from app.core.config import READ_AFTER_WRITE_SECONDS, REPLICA_MAX_LAG_SECONDS, REPLICA_CHECK_INTERVAL_SECONDS
+from app.core.metrics import Counter, Gauge
+from app.database import session
+
+logger = logging.getLogger(__name__)
+
+read_routing = Counter("db_read_routing_total", "Read sessions by target database and reason", ["target", "reason"])
+replica_lag = Gauge("db_replica_lag_seconds", "Replication lag measured by the last replica health check")
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything it
+# received, NULL when the server is not a standby (e.g. the primary under another URL)
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+class RecentWriters:
+    """Users who wrote within the last few seconds and must read their own writes"""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: int):
+        now = time.monotonic()
+        with self._lock:
+            self._until[user_id] = now + self.window
+            if len(self._until) > 1000:
+                # drop expired entries once the map grows
+                self._until = {k: v for k, v in self._until.items() if v > now}
+
+    def is_recent(self, user_id: int) -> bool:
+        until = self._until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+
+class ReplicaMonitor:
+    """
+    Periodically measures replica health and lag in a background thread,
+    so routing decisions never wait on the replica.
+    """
+
+    def __init__(self, interval: float, max_lag: float):
+        self.interval = interval
+        self.max_lag = max_lag
+        self.healthy = False
+        self.lag = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                # until the first check completes, reads stay on the primary
+                self._thread = threading.Thread(target=self._run, name="replica-monitor", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self.check()
+            time.sleep(self.interval)
+
+    def check(self):
+        try:
+            with session.read_engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    lag = conn.execute(LAG_QUERY).scalar()
+                else:
+                    conn.execute(text("SELECT 1"))
+                    lag = None
+            self.lag = float(lag or 0)
+            self.healthy = self.lag <= self.max_lag
+            replica_lag.set(self.lag)
+        except Exception:
+            if self.healthy:
+                logger.exception("Read replica health check failed")
+            self.healthy = False
+            self.lag = None
+
+    def usable(self) -> bool:
+        if self._thread is None:
+            self.start()
+        return self.healthy
+
+
+recent_writers = RecentWriters(READ_AFTER_WRITE_SECONDS)
+replica_monitor = ReplicaMonitor(REPLICA_CHECK_INTERVAL_SECONDS, REPLICA_MAX_LAG_SECONDS)
+
+
+def use_replica(user_id: int = None) -> bool:
+    """Whether this user's reads may go to the replica right now"""
+    if session.read_engine is None:
+        return False
+    if user_id is not None and recent_writers.is_recent(user_id):
+        read_routing.inc(target="primary", reason="recent_write")
+        return False
+    if not replica_monitor.usable():
+        read_routing.inc(target="primary", reason="replica_unavailable")
+        return False
+    read_routing.inc(target="replica", reason="ok")
+    return True
+
+
+def read_session_factory(user_id: int = None):
+    return session.ReadSessionLocal if use_replica(user_id) else session.SessionLocal
+
+
+def async_read_session_factory(user_id: int = None):
+    if session.AsyncReadSessionLocal is None:
+        return session.AsyncSessionLocal
+    return session.AsyncReadSessionLocal if use_replica(user_id) else session.AsyncSessionLocal
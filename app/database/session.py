@@ -1,6 +1,8 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from app.core.config import DATABASE_URL
+from app.core.config import DATABASE_URL, ASYNC_DATABASE_URL, DATABASE_READ_URL, ASYNC_DATABASE_READ_URL, DB_MODE
+from app.core.instrumentation import instrument_engine
 
 engine = create_engine(
     DATABASE_URL,
@@ -9,6 +11,46 @@ engine = create_engine(
     pool_pre_ping=True,
 )
 SessionLocal = sessionmaker(bind=engine)
+instrument_engine(engine, "primary")
+
+# optional replica for read-only traffic; app/database/routing.py decides when to use it
+read_engine = None
+ReadSessionLocal = None
+if DATABASE_READ_URL:
+    read_engine = create_engine(
+        DATABASE_READ_URL,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+    )
+    ReadSessionLocal = sessionmaker(bind=read_engine)
+    instrument_engine(read_engine, "replica")
+
+# the async engine is only built in async mode, so the sync deployment
+# does not need the async driver installed
+async_engine = None
+AsyncSessionLocal = None
+if DB_MODE == "async":
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+    )
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    instrument_engine(async_engine.sync_engine, "primary_async")
+
+async_read_engine = None
+AsyncReadSessionLocal = None
+if DB_MODE == "async" and ASYNC_DATABASE_READ_URL:
+    async_read_engine = create_async_engine(
+        ASYNC_DATABASE_READ_URL,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+    )
+    AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, expire_on_commit=False)
+    instrument_engine(async_read_engine.sync_engine, "replica_async")
 
 def get_db():
     db: Session = SessionLocal()
@@ -16,3 +58,10 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    db: AsyncSession = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -1,9 +1,17 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from app.database.base import Base
+from app.database.routing import recent_writers
 from app.database.session import engine
-from app.api import auth, subjects, tasks, schedule, statistics
+from app.api.dependency import require_metrics_access
+from app.core import metrics
+from app.core.instrumentation import MetricsMiddleware
+from app.core.tracing import SQLTraceMiddleware
+from app.core.responses import ORJSONResponse
+from app.services import jobs as job_service
+from app.api import auth, subjects, tasks, schedule, statistics, monitoring, imports
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import SQLAlchemyError
 import os
@@ -11,8 +19,16 @@ import os
 # NOTE: Tables are now created by Alembic migrations
 # Do NOT auto-create tables here anymore
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # jobs run in-process: whatever a previous process left pending died with it
+    job_service.recover_jobs()
+    yield
+
 app = FastAPI(
     title="Study Planner API",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Configure CORS based on environment
@@ -34,13 +50,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing", "X-Profile-Id"],
 )
 
+@app.middleware("http")
+async def track_user_writes(request: Request, call_next):
+    """Pin a user's reads to the primary for a short while after they wrote"""
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        user_id = getattr(request.state, "user_id", None)
+        if user_id is not None:
+            recent_writers.mark(user_id)
+    return response
+
+# added last, so they wrap every middleware above: the metrics middleware is
+# the outermost one and its latency covers all the others
+app.add_middleware(SQLTraceMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router)
 app.include_router(subjects.router)
 app.include_router(tasks.router)
 app.include_router(schedule.router)
 app.include_router(statistics.router)
+app.include_router(monitoring.router)
+app.include_router(imports.router)
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+def prometheus_metrics():
+    """Prometheus scrape endpoint; each worker process reports its own counters"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.database.base import Base
 from datetime import datetime
@@ -7,17 +7,23 @@ class Schedule(Base):
     __tablename__ = "schedules"
     
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
     title = Column(String)
     description = Column(Text, nullable=True)
     start_time = Column(DateTime)
     end_time = Column(DateTime)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)
-    subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=True)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True, index=True)
+    subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=True, index=True)
     color = Column(String, default="blue")
+    # set on entries produced by the schedule generator; manual entries are never regenerated
+    is_generated = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     user = relationship("User", backref="schedules")
     task = relationship("Task", backref="schedule_entries")
     subject = relationship("Subject")
+
+    __table_args__ = (
+        Index("ix_schedules_user_id_start_time", "user_id", "start_time"),
+    )
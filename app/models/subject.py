@@ -6,4 +6,4 @@ class Subject(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String)
     description = Column(String)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database.base import Base
 import enum
@@ -20,8 +20,16 @@ class Task(Base):
     actual_minutes = Column(Integer, nullable=True)
     status = Column(Enum(TaskStatus))
     subject_id = Column(Integer, ForeignKey("subjects.id"))
+    # owner, copied from the subject so task queries need no join
+    user_id = Column(Integer, ForeignKey("users.id"))
     completed_at = Column(DateTime, nullable=True, default=None)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     subject = relationship("Subject")
+
+    __table_args__ = (
+        Index("ix_tasks_user_id_deadline", "user_id", "deadline", "id"),
+        Index("ix_tasks_user_id_status_deadline", "user_id", "status", "deadline"),
+        Index("ix_tasks_subject_id_status", "subject_id", "status"),
+    )
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, BigInteger, Date, ForeignKey
+from app.database.base import Base
+
+class UserDailyStats(Base):
+    __tablename__ = "user_daily_stats"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    tasks_completed = Column(Integer, nullable=False, default=0)
+    actual_minutes = Column(BigInteger, nullable=False, default=0)
+    scheduled_seconds = Column(BigInteger, nullable=False, default=0)
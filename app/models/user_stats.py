@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, BigInteger, Date, DateTime, ForeignKey, LargeBinary
+from app.database.base import Base
+from datetime import datetime
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    todo_tasks = Column(Integer, nullable=False, default=0)
+    in_progress_tasks = Column(Integer, nullable=False, default=0)
+    done_tasks = Column(Integer, nullable=False, default=0)
+    total_estimated_minutes = Column(BigInteger, nullable=False, default=0)
+    total_scheduled_seconds = Column(BigInteger, nullable=False, default=0)
+    # one bit per day starting at activity_epoch, see app/services/activity.py
+    activity_epoch = Column(Date, nullable=True)
+    activity_bitmap = Column(LargeBinary, nullable=True)
+    # bumped by every write of the user's data; ETags are derived from it
+    data_version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def total_tasks(self):
+        return (self.todo_tasks or 0) + (self.in_progress_tasks or 0) + (self.done_tasks or 0)
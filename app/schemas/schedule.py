@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from datetime import datetime
 from typing import Optional
 
@@ -27,8 +27,10 @@ class ScheduleOut(BaseModel):
     task_id: Optional[int]
     subject_id: Optional[int]
     color: str
+    is_generated: bool = False
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+ScheduleList = TypeAdapter(list[ScheduleOut])
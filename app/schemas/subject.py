@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import Optional
 
 class SubjectCreate(BaseModel):
@@ -12,9 +12,13 @@ class SubjectUpdate(BaseModel):
 class SubjectOut(SubjectCreate):
     id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class SubjectWithStats(SubjectOut):
     task_count: int = 0
+    todo_tasks: int = 0
+    in_progress_tasks: int = 0
     completed_tasks: int = 0
+
+SubjectList = TypeAdapter(list[SubjectOut])
+SubjectWithStatsList = TypeAdapter(list[SubjectWithStats])
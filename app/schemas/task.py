@@ -1,4 +1,5 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+from app.core.config import TASK_BATCH_MAX_ITEMS
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -30,15 +31,24 @@ class TaskUpdate(BaseModel):
     estimated_minutes: Optional[int] = Field(None, ge=15, le=480)
     actual_minutes: Optional[int] = Field(None, ge=15, le=1440)
     status: Optional[TaskStatus] = None
+    subject_id: Optional[int] = None
+
+class TaskOut(BaseModel):
+    # output only: stored rows are not re-checked against the input constraints
+    model_config = ConfigDict(from_attributes=True)
 
-class TaskOut(TaskCreate):
     id: int
-    status: TaskStatus
+    title: Optional[str] = None
+    description: Optional[str] = None
+    priority: Optional[str] = None
+    deadline: Optional[datetime] = None
+    estimated_minutes: Optional[int] = None
     actual_minutes: Optional[int] = None
+    status: TaskStatus
+    subject_id: Optional[int] = None
     completed_at: Optional[datetime] = None
-
-    class Config:
-        orm_mode = True
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 class TaskWithSubject(TaskOut):
     subject_name: Optional[str] = None
@@ -46,3 +56,36 @@ class TaskWithSubject(TaskOut):
 class TaskComplete(BaseModel):
     actual_minutes: int = Field(..., ge=15, le=1440)
 
+class TaskImportRow(BaseModel):
+    # the export columns; id and timestamps of exported files are ignored
+    title: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = Field(None, max_length=2000)
+    subject_name: str = Field(..., min_length=1, max_length=255)
+    priority: TaskPriority = TaskPriority.MEDIUM
+    status: TaskStatus = TaskStatus.TODO
+    deadline: datetime
+    estimated_minutes: int = Field(..., ge=15, le=480)
+    actual_minutes: Optional[int] = Field(None, ge=15, le=1440)
+    completed_at: Optional[datetime] = None
+
+class TaskBatchCreate(BaseModel):
+    items: list[TaskCreate] = Field(..., min_length=1, max_length=TASK_BATCH_MAX_ITEMS)
+
+class TaskBatchUpdateItem(TaskUpdate):
+    # completing a task is an update with status "done" (and actual_minutes)
+    id: int
+
+class TaskBatchUpdate(BaseModel):
+    items: list[TaskBatchUpdateItem] = Field(..., min_length=1, max_length=TASK_BATCH_MAX_ITEMS)
+
+class TaskBatchItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    ok: bool
+    error: Optional[str] = None
+
+class TaskBatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[TaskBatchItemResult]
+
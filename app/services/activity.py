@@ -0,0 +1,93 @@
+from datetime import date, timedelta
+
+# A user's study activity is kept as a bitmap with one bit per day:
+# bit i is set when at least one task was completed on epoch + i days.
+# The bitmap is stored little-endian, so it can be loaded into a Python int
+# and every question below becomes a handful of big-int operations.
+
+
+def load_bits(bitmap: bytes | None) -> int:
+    return int.from_bytes(bitmap, "little") if bitmap else 0
+
+
+def dump_bits(bits: int) -> bytes:
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def set_days(epoch: date | None, bits: int, days: dict):
+    """Set or clear the bits for {day: active}; rebases the epoch if a day precedes it"""
+    if not days:
+        return epoch, bits
+
+    first = min(days)
+    if epoch is None:
+        epoch = first
+    elif first < epoch:
+        bits <<= (epoch - first).days
+        epoch = first
+
+    for day, active in days.items():
+        mask = 1 << (day - epoch).days
+        bits = bits | mask if active else bits & ~mask
+    return epoch, bits
+
+
+def _index(epoch: date, day: date) -> int:
+    return (day - epoch).days
+
+
+def current_streak(epoch: date | None, bits: int, today: date) -> int:
+    """Consecutive active days ending today (or yesterday, if today is not active yet)"""
+    if epoch is None or not bits:
+        return 0
+
+    end = _index(epoch, today)
+    if end < 0:
+        return 0
+    if not bits >> end & 1:
+        end -= 1
+        if end < 0 or not bits >> end & 1:
+            return 0
+
+    # the run ends just above the highest inactive day at or below `end`
+    window = (1 << (end + 1)) - 1
+    gaps = ~bits & window
+    return end + 1 if not gaps else end - (gaps.bit_length() - 1)
+
+
+def longest_streak(bits: int) -> int:
+    """Length of the longest run of active days"""
+    longest = 0
+    while bits:
+        bits &= bits >> 1
+        longest += 1
+    return longest
+
+
+def active_days(epoch: date | None, bits: int, start: date, end: date) -> int:
+    """Number of active days in start..end inclusive"""
+    if epoch is None or not bits or start > end:
+        return 0
+    lo = max(_index(epoch, start), 0)
+    hi = _index(epoch, end)
+    if hi < lo:
+        return 0
+    return (bits >> lo & ((1 << (hi - lo + 1)) - 1)).bit_count()
+
+
+def active_dates(epoch: date | None, bits: int, start: date, end: date) -> list:
+    """Active days in start..end inclusive, oldest first"""
+    if epoch is None or not bits or start > end:
+        return []
+    lo = max(_index(epoch, start), 0)
+    hi = _index(epoch, end)
+    if hi < lo:
+        return []
+
+    window = bits >> lo & ((1 << (hi - lo + 1)) - 1)
+    dates = []
+    while window:
+        low_bit = window & -window
+        dates.append(epoch + timedelta(days=lo + low_bit.bit_length() - 1))
+        window ^= low_bit
+    return dates
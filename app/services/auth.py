@@ -1,32 +1,68 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
 from app.models.user import User
-from app.core.security import hash_pwd, verify_pwd, create_access_token
+from app.core.security import hash_pwd_async, verify_and_update_pwd_async, create_access_token
+from app.core.user_cache import user_cache
+from app.services.rollups import create_user_stats
 
 
-def register_user(db: Session, email: str, username: str, password: str):
+# The auth services are async so the password hash is awaited without holding
+# a thread; their (short) session work runs in the threadpool in between.
+
+def _check_available(db: Session, email: str, username: str):
     if db.query(User).filter(User.email == email).first():
         raise HTTPException(status_code=400, detail="Email already registered")
     
     if db.query(User).filter(User.username == username).first():
         raise HTTPException(status_code=400, detail="Username already taken")
-    
+
+
+def _create_user(db: Session, email: str, username: str, hashed: str):
     db_user = User(
         email=email,
         username=username,
-        password=hash_pwd(password)
+        password=hashed
     )
     db.add(db_user)
+    db.flush()
+    create_user_stats(db, db_user.id)
     db.commit()
     db.refresh(db_user)
     
     return db_user
 
 
-def authenticate_user(db: Session, email: str, password: str):
+async def register_user_async(db: Session, email: str, username: str, password: str):
+    await run_in_threadpool(_check_available, db, email, username)
+    hashed = await hash_pwd_async(password)
+    return await run_in_threadpool(_create_user, db, email, username, hashed)
+
+
+def _find_user(db: Session, email: str):
     user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_pwd(password, user.password):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    return user
+
+
+def _store_rehash(db: Session, user: User, new_hash: str):
+    # the configured bcrypt cost changed since this hash was made
+    user.password = new_hash
+    db.commit()
+    db.refresh(user)
+
+
+async def authenticate_user_async(db: Session, email: str, password: str):
+    user = await run_in_threadpool(_find_user, db, email)
+    
+    valid, new_hash = await verify_and_update_pwd_async(password, user.password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    if new_hash:
+        await run_in_threadpool(_store_rehash, db, user, new_hash)
     return user
 
 
@@ -41,3 +77,27 @@ def get_user_response(user: User):
         "email": user.email,
         "username": user.username
     }
+
+
+CHANGED_ACCOUNTS = "changed_accounts"
+
+# Updated or deleted user rows (a role change included) are dropped from this
+# process's user cache once the transaction commits; writes made by other
+# processes are picked up when the entry's TTL runs out.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _record_account_change(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(CHANGED_ACCOUNTS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for user_id in session.info.pop(CHANGED_ACCOUNTS, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop(CHANGED_ACCOUNTS, None)
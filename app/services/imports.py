@@ -0,0 +1,172 @@
+import codecs
+import csv
+import json
+import os
+from datetime import datetime
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.core.config import IMPORT_CHUNK_SIZE, IMPORT_MAX_ERRORS
+from app.database.bulk import bulk_insert
+from app.models.subject import Subject
+from app.models.task import Task, TaskStatus
+from app.schemas.task import TaskImportRow
+from app.services.jobs import job_handler
+from app.services.rollups import record_task_changes, task_snapshot
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+def detect_format(filename: str = None, content_type: str = None) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or (content_type or "").endswith(("ndjson", "jsonl")):
+        return "ndjson"
+    if name.endswith(".csv") or (content_type or "").endswith("csv"):
+        return "csv"
+    raise HTTPException(status_code=400, detail="Unknown import format: use a .csv or .ndjson file or pass format")
+
+
+def _iter_csv(stream):
+    reader = csv.DictReader(codecs.iterdecode(stream, "utf-8-sig"))
+    for record in reader:
+        yield reader.line_num, record
+
+
+def _iter_ndjson(stream):
+    for line_no, line in enumerate(codecs.iterdecode(stream, "utf-8-sig"), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_no, "Invalid JSON"
+            continue
+        yield line_no, record if isinstance(record, dict) else "Expected a JSON object"
+
+
+def parse_rows(stream, fmt: str):
+    """
+    Yield (line, TaskImportRow) or (line, error message) for every record of a
+    binary stream, reading it incrementally. Empty values count as missing.
+    """
+    records = _iter_csv(stream) if fmt == "csv" else _iter_ndjson(stream)
+    for line_no, record in records:
+        if isinstance(record, str):
+            yield line_no, record
+            continue
+        try:
+            yield line_no, TaskImportRow.model_validate(
+                {k: v for k, v in record.items() if k is not None and v not in ("", None)}
+            )
+        except ValidationError as exc:
+            yield line_no, "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()
+            )
+        except (TypeError, ValueError) as exc:
+            yield line_no, str(exc)
+
+
+class SubjectResolver:
+    """Subject ids by name for one user; names not seen yet are created per chunk"""
+
+    def __init__(self, db: Session, user_id: int):
+        self.db = db
+        self.user_id = user_id
+        self.created = 0
+        self.ids = {}
+        # names are not unique: the oldest subject wins, like a lookup by hand would
+        for subject_id, name in db.execute(
+            select(Subject.id, Subject.name).where(Subject.user_id == user_id).order_by(Subject.id.desc())
+        ):
+            self.ids[name] = subject_id
+
+    def resolve(self, names: set) -> dict:
+        missing = sorted(names - self.ids.keys())
+        if missing:
+            ids = self.db.scalars(
+                insert(Subject).returning(Subject.id, sort_by_parameter_order=True),
+                [{"name": name, "user_id": self.user_id} for name in missing],
+            ).all()
+            self.ids.update(zip(missing, ids))
+            self.created += len(missing)
+        return self.ids
+
+
+def _task_values(row: TaskImportRow, subject_id: int, user_id: int, now: datetime) -> dict:
+    status = TaskStatus(row.status.value)
+    completed_at = row.completed_at
+    if status == TaskStatus.done and completed_at is None:
+        completed_at = now
+    elif status != TaskStatus.done:
+        completed_at = None
+    return {
+        "title": row.title,
+        "description": row.description,
+        "priority": row.priority.value,
+        "deadline": row.deadline,
+        "estimated_minutes": row.estimated_minutes,
+        "actual_minutes": row.actual_minutes,
+        "status": status,
+        "subject_id": subject_id,
+        "user_id": user_id,
+        "completed_at": completed_at,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def import_tasks(db: Session, user_id: int, stream, fmt: str, chunk_size: int = None, progress=None) -> dict:
+    """
+    Import tasks from a CSV or NDJSON stream (the export columns; subjects are
+    matched or created by subject_name). Rows are validated one at a time and
+    written chunk_size at a time, one transaction per chunk (COPY on Postgres,
+    a multi-row INSERT elsewhere), so memory stays bounded by one chunk.
+    Invalid rows are skipped and reported with their line number; a failure
+    mid-file keeps the chunks committed before it.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown import format: {fmt}")
+    chunk_size = chunk_size or IMPORT_CHUNK_SIZE
+
+    subjects = SubjectResolver(db, user_id)
+    counts = {"rows_read": 0, "imported": 0, "failed": 0}
+    errors = []
+    chunk = []
+
+    def flush():
+        if not chunk:
+            return
+        ids = subjects.resolve({row.subject_name for row in chunk})
+        now = datetime.utcnow()
+        rows = [_task_values(row, ids[row.subject_name], user_id, now) for row in chunk]
+        bulk_insert(db, Task, rows)
+        record_task_changes(db, user_id, [(None, task_snapshot(Task(**row))) for row in rows])
+        db.commit()
+        counts["imported"] += len(rows)
+        chunk.clear()
+        if progress:
+            progress(dict(counts))
+
+    for line_no, row in parse_rows(stream, fmt):
+        counts["rows_read"] += 1
+        if isinstance(row, str):
+            counts["failed"] += 1
+            if len(errors) < IMPORT_MAX_ERRORS:
+                errors.append({"line": line_no, "error": row})
+            continue
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+
+    return {**counts, "subjects_created": subjects.created, "errors": errors}
+
+
+@job_handler("import_tasks")
+def _import_tasks_job(db: Session, user_id: int, params: dict, progress):
+    path = params["path"]
+    try:
+        with open(path, "rb") as stream:
+            return import_tasks(db, user_id, stream, params["format"], progress=progress)
+    finally:
+        os.remove(path)
@@ -0,0 +1,208 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import JOB_WORKERS, JOB_TIMEOUT_SECONDS
+from app.database.routing import recent_writers
+from app.database.session import SessionLocal
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# kind -> handler(db, user_id, params, progress) returning a JSON-serialisable result;
+# progress(dict) publishes partial counters on the job row while it runs
+JOB_HANDLERS = {}
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="jobs")
+
+
+def job_handler(kind: str):
+    def register(fn):
+        JOB_HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def submit_job(db: Session, user_id: int, kind: str, params: dict = None) -> Job:
+    """
+    Queue a job for the in-process worker pool and return its row right away.
+    A user has at most one pending job per kind; duplicate submissions get that job back.
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    active = get_active_job(db, user_id, kind)
+    if active:
+        return active
+
+    job = Job(user_id=user_id, kind=kind, status="queued", params=params or {})
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # another request (or process) queued the same job first
+        db.rollback()
+        active = get_active_job(db, user_id, kind)
+        if active:
+            return active
+        raise
+
+    db.refresh(job)
+    _executor.submit(_run_job, job.id)
+    return job
+
+
+def run_job_now(db: Session, user_id: int, kind: str, params: dict = None):
+    """
+    Run a job in the calling thread and return its result. The job row is
+    claimed like a queued one, so it never overlaps a background job of the
+    same kind: while one is pending this raises 409.
+    """
+    if get_active_job(db, user_id, kind):
+        raise HTTPException(status_code=409, detail="A job of this kind is already running")
+
+    job = Job(user_id=user_id, kind=kind, status="running", params=params or {}, started_at=datetime.utcnow())
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="A job of this kind is already running")
+
+    job_id = job.id
+    try:
+        result = JOB_HANDLERS[kind](db, user_id, dict(params or {}), lambda progress: None)
+    except HTTPException as exc:
+        db.rollback()
+        _finish(db, job_id, "failed", error=str(exc.detail))
+        raise
+    except Exception as exc:
+        db.rollback()
+        _finish(db, job_id, "failed", error=str(exc) or exc.__class__.__name__)
+        raise
+    _finish(db, job_id, "succeeded", result=result)
+    return result
+
+
+def get_active_job(db: Session, user_id: int, kind: str):
+    job = db.query(Job).filter(
+        Job.user_id == user_id,
+        Job.kind == kind,
+        Job.status.in_(ACTIVE_STATUSES)
+    ).first()
+    if job is None:
+        return None
+
+    # queued jobs always have a live submission (recover_jobs clears the rest at
+    # startup); a running one past the timeout has a stuck or dead worker
+    if job.status == "running" and job.started_at < datetime.utcnow() - timedelta(seconds=JOB_TIMEOUT_SECONDS):
+        _finish(db, job.id, "failed", error="Job was abandoned")
+        return None
+    return job
+
+
+def recover_jobs() -> int:
+    """
+    Fail the jobs left queued or running by a previous process: their worker
+    threads died with it. Call once at startup, before any job is submitted
+    (jobs run in-process, so this assumes one application process).
+    """
+    db = SessionLocal()
+    try:
+        recovered = db.execute(
+            update(Job)
+            .where(Job.status.in_(ACTIVE_STATUSES))
+            .values(status="failed", error="Job was interrupted by a restart", finished_at=datetime.utcnow())
+        ).rowcount
+        db.commit()
+    finally:
+        db.close()
+    if recovered:
+        logger.warning("Marked %d interrupted job(s) as failed", recovered)
+    return recovered
+
+
+def _run_job(job_id: int):
+    db = SessionLocal()
+    try:
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="running", started_at=datetime.utcnow())
+        ).rowcount
+        db.commit()
+        job = db.get(Job, job_id)
+        if not claimed or job is None:
+            return
+
+        try:
+            result = JOB_HANDLERS[job.kind](db, job.user_id, job.params or {}, _progress_reporter(job_id))
+        except HTTPException as exc:
+            db.rollback()
+            _finish(db, job_id, "failed", error=str(exc.detail))
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Job %s (%s) failed", job_id, job.kind)
+            _finish(db, job_id, "failed", error=str(exc) or exc.__class__.__name__)
+        else:
+            _finish(db, job_id, "succeeded", result=result)
+            recent_writers.mark(job.user_id)
+    finally:
+        db.close()
+
+
+def _progress_reporter(job_id: int):
+    def report(progress: dict):
+        # own session: the handler's transaction may still be open
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.id == job_id).update({Job.progress: progress}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+    return report
+
+
+def _finish(db: Session, job_id: int, status: str, result=None, error: str = None):
+    # only a running job can finish: one already marked abandoned keeps that status
+    finished = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == "running")
+        .values(status=status, result=result, error=error, finished_at=datetime.utcnow())
+    ).rowcount
+    db.commit()
+    if not finished:
+        logger.warning("Job %s was no longer running when it finished (%s)", job_id, status)
+
+
+def get_job(db: Session, job_id: int, user_id: int, kind: str = None):
+    query = db.query(Job).filter(Job.id == job_id, Job.user_id == user_id)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    job = query.first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def format_job_response(job: Job):
+    duration = None
+    if job.started_at:
+        duration = round(((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds(), 3)
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "duration_seconds": duration,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error,
+    }
@@ -0,0 +1,323 @@
+from datetime import date
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.user_stats import UserStats
+from app.models.user_daily_stats import UserDailyStats
+from app.models.task import Task, TaskStatus
+from app.models.schedule import Schedule
+from app.services import activity
+
+STATUS_COLUMNS = {
+    TaskStatus.todo: "todo_tasks",
+    TaskStatus.in_progress: "in_progress_tasks",
+    TaskStatus.done: "done_tasks",
+}
+
+DAILY_COLUMNS = ["tasks_completed", "actual_minutes", "scheduled_seconds"]
+
+
+def task_snapshot(task):
+    """Capture the task fields that feed the per-user rollups"""
+    if task is None:
+        return None
+    status = TaskStatus(task.status) if task.status else TaskStatus.todo
+    completed = status == TaskStatus.done and task.completed_at is not None
+    return {
+        "status": status,
+        "estimated_minutes": task.estimated_minutes or 0,
+        "completed_day": task.completed_at.date() if completed else None,
+        "actual_minutes": (task.actual_minutes or 0) if completed else 0,
+    }
+
+
+def schedule_snapshot(schedule):
+    """Capture the schedule fields that feed the per-user rollups"""
+    if schedule is None:
+        return None
+    return interval_snapshot(schedule.start_time, schedule.end_time)
+
+
+def interval_snapshot(start_time, end_time):
+    if not start_time or not end_time:
+        return None
+    return {
+        "day": start_time.date(),
+        "seconds": int((end_time - start_time).total_seconds()),
+    }
+
+
+def record_task_changes(db: Session, user_id: int, changes: list):
+    """
+    Apply (before, after) task snapshots to the user's rollup rows.
+    Call after the change has been made on the session and before commit,
+    so the counters are updated in the same transaction as the task rows.
+    """
+    if not changes:
+        return
+    deltas = {"data_version": 1}
+    daily = {}
+    for before, after in changes:
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is None:
+                continue
+            column = STATUS_COLUMNS[snapshot["status"]]
+            deltas[column] = deltas.get(column, 0) + sign
+            deltas["total_estimated_minutes"] = deltas.get("total_estimated_minutes", 0) + sign * snapshot["estimated_minutes"]
+
+            if snapshot["completed_day"] is not None:
+                day = daily.setdefault(snapshot["completed_day"], {})
+                day["tasks_completed"] = day.get("tasks_completed", 0) + sign
+                day["actual_minutes"] = day.get("actual_minutes", 0) + sign * snapshot["actual_minutes"]
+
+    _apply_stats_delta(db, user_id, deltas)
+    _apply_daily_deltas(db, user_id, daily)
+    _apply_activity(db, user_id, [d for d, day in daily.items() if day.get("tasks_completed")])
+
+
+def record_task_change(db: Session, user_id: int, before, after):
+    record_task_changes(db, user_id, [(before, after)])
+
+
+def record_schedule_changes(db: Session, user_id: int, changes: list):
+    """Same contract as record_task_changes, for (before, after) schedule snapshots"""
+    if not changes:
+        return
+    total = 0
+    daily = {}
+    for before, after in changes:
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is None:
+                continue
+            total += sign * snapshot["seconds"]
+            day = daily.setdefault(snapshot["day"], {})
+            day["scheduled_seconds"] = day.get("scheduled_seconds", 0) + sign * snapshot["seconds"]
+
+    _apply_stats_delta(db, user_id, {"total_scheduled_seconds": total, "data_version": 1})
+    _apply_daily_deltas(db, user_id, daily)
+
+
+def record_schedule_change(db: Session, user_id: int, before, after):
+    record_schedule_changes(db, user_id, [(before, after)])
+
+
+def bump_data_version(db: Session, user_id: int):
+    """Mark the user's data as changed, for writes that do not touch the counters"""
+    _apply_stats_delta(db, user_id, {"data_version": 1})
+
+
+def _apply_stats_delta(db: Session, user_id: int, deltas: dict):
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+
+    # atomic increments so concurrent writers never lose updates
+    updated = db.query(UserStats).filter(UserStats.user_id == user_id).update(
+        {getattr(UserStats, k): getattr(UserStats, k) + v for k, v in deltas.items()},
+        synchronize_session=False,
+    )
+    if not updated:
+        # no rollup row yet: build it from the flushed rows, which already include this change
+        db.flush()
+        rebuild_user_stats(db, user_id)
+
+
+def _apply_daily_deltas(db: Session, user_id: int, daily: dict):
+    rows = []
+    for day, deltas in sorted(daily.items()):
+        if any(deltas.values()):
+            rows.append({"user_id": user_id, "day": day, **{c: deltas.get(c, 0) for c in DAILY_COLUMNS}})
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        # one upsert statement for all touched days
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(UserDailyStats)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserDailyStats.user_id, UserDailyStats.day],
+            set_={c: getattr(UserDailyStats, c) + getattr(stmt.excluded, c) for c in DAILY_COLUMNS},
+        )
+        db.execute(stmt, rows)
+        return
+
+    for row in rows:
+        updated = db.query(UserDailyStats).filter(
+            UserDailyStats.user_id == user_id,
+            UserDailyStats.day == row["day"]
+        ).update(
+            {getattr(UserDailyStats, c): getattr(UserDailyStats, c) + row[c] for c in DAILY_COLUMNS},
+            synchronize_session=False,
+        )
+        if not updated:
+            db.add(UserDailyStats(**row))
+
+
+def _apply_activity(db: Session, user_id: int, days: list):
+    """Sync the activity bits of the given days with their (already updated) daily rows"""
+    if not days:
+        return
+
+    counts = dict(db.query(UserDailyStats.day, UserDailyStats.tasks_completed).filter(
+        UserDailyStats.user_id == user_id,
+        UserDailyStats.day.in_(days)
+    ).all())
+
+    stats = db.query(UserStats).filter(
+        UserStats.user_id == user_id
+    ).with_for_update().populate_existing().one_or_none()
+    if stats is None:
+        # a fresh row is built from the daily rows, which already reflect this change
+        rebuild_user_stats(db, user_id)
+        return
+
+    epoch, bits = activity.set_days(
+        stats.activity_epoch,
+        activity.load_bits(stats.activity_bitmap),
+        {day: counts.get(day, 0) > 0 for day in days},
+    )
+    stats.activity_epoch = epoch
+    stats.activity_bitmap = activity.dump_bits(bits)
+
+
+def compute_user_stats(db: Session, user_id: int) -> UserStats:
+    """Compute a (transient) rollup row from the task, schedule and daily rollup tables"""
+    stats = _empty_stats(user_id)
+
+    rows = db.query(
+        Task.status,
+        func.count(Task.id),
+        func.coalesce(func.sum(Task.estimated_minutes), 0),
+    ).filter(Task.user_id == user_id).group_by(Task.status).all()
+
+    for status, count, minutes in rows:
+        column = STATUS_COLUMNS[TaskStatus(status) if status else TaskStatus.todo]
+        setattr(stats, column, getattr(stats, column) + count)
+        stats.total_estimated_minutes += int(minutes)
+
+    intervals = db.query(Schedule.start_time, Schedule.end_time).filter(Schedule.user_id == user_id)
+    stats.total_scheduled_seconds = sum(
+        int((end - start).total_seconds()) for start, end in intervals if start and end
+    )
+
+    active = db.query(UserDailyStats.day).filter(
+        UserDailyStats.user_id == user_id,
+        UserDailyStats.tasks_completed > 0
+    )
+    epoch, bits = activity.set_days(None, 0, {day: True for day, in active})
+    stats.activity_epoch = epoch
+    stats.activity_bitmap = activity.dump_bits(bits)
+    return stats
+
+
+def rebuild_user_stats(db: Session, user_id: int) -> UserStats:
+    """Recompute the user's counter row from scratch"""
+    fresh = compute_user_stats(db, user_id)
+    stats = db.get(UserStats, user_id)
+    if stats is None:
+        # above the 0 reported for users without a row, so cached ETags go stale
+        fresh.data_version = 1
+        db.add(fresh)
+        return fresh
+    stats.data_version = (stats.data_version or 0) + 1
+
+    columns = list(STATUS_COLUMNS.values()) + [
+        "total_estimated_minutes", "total_scheduled_seconds", "activity_epoch", "activity_bitmap",
+    ]
+    for column in columns:
+        setattr(stats, column, getattr(fresh, column))
+    return stats
+
+
+def rebuild_daily_stats(db: Session, user_id: int):
+    """Recompute the user's per-day rows from scratch"""
+    daily = {}
+
+    completed = db.query(Task.completed_at, Task.actual_minutes).filter(
+        Task.user_id == user_id,
+        Task.status == TaskStatus.done,
+        Task.completed_at.isnot(None)
+    )
+    for completed_at, actual_minutes in completed:
+        day = daily.setdefault(completed_at.date(), {})
+        day["tasks_completed"] = day.get("tasks_completed", 0) + 1
+        day["actual_minutes"] = day.get("actual_minutes", 0) + (actual_minutes or 0)
+
+    intervals = db.query(Schedule.start_time, Schedule.end_time).filter(Schedule.user_id == user_id)
+    for start, end in intervals:
+        if start and end:
+            day = daily.setdefault(start.date(), {})
+            day["scheduled_seconds"] = day.get("scheduled_seconds", 0) + int((end - start).total_seconds())
+
+    db.query(UserDailyStats).filter(UserDailyStats.user_id == user_id).delete(synchronize_session=False)
+    _apply_daily_deltas(db, user_id, daily)
+
+
+def rebuild_user_rollups(db: Session, user_id: int):
+    """Recompute every rollup of a user (backfill / repair)"""
+    # the activity bitmap on the stats row is derived from the daily rows
+    rebuild_daily_stats(db, user_id)
+    rebuild_user_stats(db, user_id)
+
+
+def load_user_stats(db: Session, user_id: int) -> UserStats:
+    """Single-row lookup; falls back to an on-the-fly computation for users not backfilled yet"""
+    stats = db.get(UserStats, user_id)
+    if stats is None:
+        stats = compute_user_stats(db, user_id)
+    return stats
+
+
+async def load_user_stats_async(db: AsyncSession, user_id: int) -> UserStats:
+    stats = await db.get(UserStats, user_id)
+    if stats is None:
+        stats = await db.run_sync(compute_user_stats, user_id)
+    return stats
+
+
+def data_version_select(user_id: int):
+    return select(UserStats.data_version).where(UserStats.user_id == user_id)
+
+
+def load_data_version(db: Session, user_id: int) -> int:
+    """The user's data version, without reading any task or schedule rows"""
+    return db.execute(data_version_select(user_id)).scalar() or 0
+
+
+async def load_data_version_async(db: AsyncSession, user_id: int) -> int:
+    return (await db.execute(data_version_select(user_id))).scalar() or 0
+
+
+def daily_stats_select(user_id: int, start: date, end: date):
+    """Per-day rows for start..end inclusive, in one range scan of the primary key"""
+    return select(UserDailyStats).where(
+        UserDailyStats.user_id == user_id,
+        UserDailyStats.day >= start,
+        UserDailyStats.day <= end
+    ).order_by(UserDailyStats.day)
+
+
+def load_daily_stats(db: Session, user_id: int, start: date, end: date):
+    return db.scalars(daily_stats_select(user_id, start, end)).all()
+
+
+async def load_daily_stats_async(db: AsyncSession, user_id: int, start: date, end: date):
+    return (await db.scalars(daily_stats_select(user_id, start, end))).all()
+
+
+def create_user_stats(db: Session, user_id: int):
+    db.add(_empty_stats(user_id))
+
+
+def _empty_stats(user_id: int) -> UserStats:
+    return UserStats(
+        user_id=user_id,
+        todo_tasks=0,
+        in_progress_tasks=0,
+        done_tasks=0,
+        total_estimated_minutes=0,
+        total_scheduled_seconds=0,
+        data_version=0,
+    )
@@ -1,9 +1,23 @@
+import time
+from collections import defaultdict
 from datetime import datetime
 from fastapi import HTTPException
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.metrics import Histogram
+from app.database.bulk import bulk_insert
 from app.models.schedule import Schedule
 from app.models.subject import Subject
 from app.models.task import Task
+from app.services.jobs import job_handler
+from app.services.rollups import interval_snapshot, record_schedule_change, record_schedule_changes, schedule_snapshot
+
+schedule_generation_latency = Histogram(
+    "schedule_generation_seconds",
+    "Schedule generation time by phase (load: tasks and busy time, generate: the scheduler, sync: writing entries)",
+    ["phase"],
+)
 
 
 def create_schedule(db: Session, user_id: int, schedule_data: dict):
@@ -16,29 +30,38 @@ def create_schedule(db: Session, user_id: int, schedule_data: dict):
             raise HTTPException(status_code=403, detail="Subject not found or access denied")
     
     if schedule_data.get('task_id'):
-        task = db.query(Task).join(Subject).filter(
+        task = db.query(Task).filter(
             Task.id == schedule_data['task_id'],
-            Subject.user_id == user_id
+            Task.user_id == user_id
         ).first()
         if not task:
             raise HTTPException(status_code=403, detail="Task not found or access denied")
     
     db_schedule = Schedule(**schedule_data, user_id=user_id)
     db.add(db_schedule)
+    record_schedule_change(db, user_id, None, schedule_snapshot(db_schedule))
     db.commit()
     db.refresh(db_schedule)
     return db_schedule
 
 
-def list_user_schedules(db: Session, user_id: int, start_date: datetime = None, end_date: datetime = None):
-    query = db.query(Schedule).filter(Schedule.user_id == user_id)
+def schedule_list_select(user_id: int, start_date: datetime = None, end_date: datetime = None):
+    stmt = select(Schedule).where(Schedule.user_id == user_id)
     
     if start_date:
-        query = query.filter(Schedule.start_time >= start_date)
+        stmt = stmt.where(Schedule.start_time >= start_date)
     if end_date:
-        query = query.filter(Schedule.end_time <= end_date)
+        stmt = stmt.where(Schedule.end_time <= end_date)
     
-    return query.order_by(Schedule.start_time).all()
+    return stmt.order_by(Schedule.start_time)
+
+
+def list_user_schedules(db: Session, user_id: int, start_date: datetime = None, end_date: datetime = None):
+    return db.scalars(schedule_list_select(user_id, start_date, end_date)).all()
+
+
+async def list_user_schedules_async(db: AsyncSession, user_id: int, start_date: datetime = None, end_date: datetime = None):
+    return (await db.scalars(schedule_list_select(user_id, start_date, end_date))).all()
 
 
 def get_schedule_by_id(db: Session, schedule_id: int, user_id: int):
@@ -53,12 +76,19 @@ def get_schedule_by_id(db: Session, schedule_id: int, user_id: int):
 
 def update_schedule(db: Session, schedule_id: int, user_id: int, update_data: dict):
     db_schedule = get_schedule_by_id(db, schedule_id, user_id)
+    before = schedule_snapshot(db_schedule)
     
     update_dict = {k: v for k, v in update_data.items() if v is not None}
     
     for key, value in update_dict.items():
         setattr(db_schedule, key, value)
+
+    # an edited entry belongs to the user now: regeneration must neither move nor
+    # delete it, and the scheduler plans around it like any manual entry
+    if update_dict:
+        db_schedule.is_generated = False
     
+    record_schedule_change(db, user_id, before, schedule_snapshot(db_schedule))
     db.commit()
     db.refresh(db_schedule)
     return db_schedule
@@ -67,17 +97,145 @@ def update_schedule(db: Session, schedule_id: int, user_id: int, update_data: di
 def delete_schedule(db: Session, schedule_id: int, user_id: int):
     schedule = get_schedule_by_id(db, schedule_id, user_id)
     db.delete(schedule)
+    record_schedule_change(db, user_id, schedule_snapshot(schedule), None)
     db.commit()
     return {"ok": True}
 
 
+def list_busy_intervals(db: Session, user_id: int, after: datetime):
+    """(start, end) of the user's manual entries that end after the given moment"""
+    return db.query(Schedule.start_time, Schedule.end_time).filter(
+        Schedule.user_id == user_id,
+        Schedule.is_generated.is_(False),
+        Schedule.end_time > after
+    ).all()
+
+
 def clear_user_schedules(db: Session, user_id: int):
-    db.query(Schedule).filter(Schedule.user_id == user_id).delete()
+    """Remove the generated entries of a user; manual entries are kept"""
+    query = db.query(Schedule).filter(Schedule.user_id == user_id, Schedule.is_generated.is_(True))
+    removed = [(schedule_snapshot(s), None) for s in query.with_entities(Schedule.start_time, Schedule.end_time)]
+    query.delete()
+    record_schedule_changes(db, user_id, removed)
     db.commit()
 
 
+GENERATED_FIELDS = ("title", "description", "start_time", "end_time", "task_id", "subject_id", "color")
+
+
 def create_schedules_from_tasks(db: Session, user_id: int, schedule_entries: list):
+    """
+    Sync the user's generated entries with a freshly generated schedule.
+    Identical rows are left alone, stale rows are reused for new entries,
+    and the rest is deleted/inserted - all with bulk statements in one transaction.
+    """
+    existing = db.query(Schedule.id, *[getattr(Schedule, f) for f in GENERATED_FIELDS]).filter(
+        Schedule.user_id == user_id,
+        Schedule.is_generated.is_(True)
+    ).order_by(Schedule.start_time, Schedule.id).all()
+
+    existing_by_key = defaultdict(list)
+    for row in existing:
+        existing_by_key[tuple(getattr(row, f) for f in GENERATED_FIELDS)].append(row)
+
+    new_entries = []
+    unchanged = 0
     for entry in schedule_entries:
-        db_schedule = Schedule(**entry)
-        db.add(db_schedule)
+        matches = existing_by_key.get(tuple(entry.get(f) for f in GENERATED_FIELDS))
+        if matches:
+            matches.pop(0)
+            unchanged += 1
+        else:
+            new_entries.append(entry)
+
+    stale = sorted((row for rows in existing_by_key.values() for row in rows), key=lambda r: (r.start_time, r.id))
+    new_entries.sort(key=lambda e: (e["start_time"], e["end_time"]))
+
+    reused = list(zip(stale, new_entries))
+    to_delete = stale[len(reused):]
+    to_insert = new_entries[len(reused):]
+    now = datetime.utcnow()
+
+    if reused:
+        db.execute(update(Schedule), [
+            {"id": row.id, **{f: entry.get(f) for f in GENERATED_FIELDS}, "updated_at": now}
+            for row, entry in reused
+        ])
+    if to_delete:
+        db.execute(delete(Schedule).where(Schedule.id.in_([row.id for row in to_delete])))
+    if to_insert:
+        bulk_insert(db, Schedule, [
+            {
+                **{f: entry.get(f) for f in GENERATED_FIELDS},
+                "user_id": user_id,
+                "is_generated": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for entry in to_insert
+        ])
+
+    changes = [(interval_snapshot(row.start_time, row.end_time), None) for row in stale]
+    changes += [(None, interval_snapshot(e["start_time"], e["end_time"])) for e in new_entries]
+    record_schedule_changes(db, user_id, changes)
     db.commit()
+
+    return {
+        "created": len(to_insert),
+        "updated": len(reused),
+        "deleted": len(to_delete),
+        "unchanged": unchanged,
+    }
+
+
+def generate_user_schedule(
+    db: Session,
+    user_id: int,
+    end_date: datetime = None,
+    short_break_minutes: int = 5,
+    medium_break_minutes: int = 15,
+    long_break_minutes: int = 30,
+    long_break_after_minutes: int = 90,
+    day_start_hour: int = 9,
+    day_end_hour: int = 18,
+):
+    """Load the user's tasks and busy time, generate a schedule and sync it"""
+    from app.services.scheduler import generate_schedule_from_tasks
+    
+    started = time.perf_counter()
+    tasks = db.query(Task).filter(Task.user_id == user_id).all()
+    if not tasks:
+        raise HTTPException(400, "No tasks found to schedule")
+    
+    now = datetime.utcnow()
+    busy = list_busy_intervals(db, user_id, now)
+    loaded = time.perf_counter()
+    schedule_generation_latency.observe(loaded - started, phase="load")
+    
+    schedule_entries = generate_schedule_from_tasks(
+        tasks,
+        user_id,
+        end_date=end_date,
+        short_break_minutes=short_break_minutes,
+        medium_break_minutes=medium_break_minutes,
+        long_break_minutes=long_break_minutes,
+        long_break_after_minutes=long_break_after_minutes,
+        busy=busy,
+        day_start_hour=day_start_hour,
+        day_end_hour=day_end_hour,
+        now=now,
+    )
+    generated = time.perf_counter()
+    schedule_generation_latency.observe(generated - loaded, phase="generate")
+    
+    changes = create_schedules_from_tasks(db, user_id, schedule_entries)
+    schedule_generation_latency.observe(time.perf_counter() - generated, phase="sync")
+    return {"entries_created": len(schedule_entries), "changes": changes}
+
+
+@job_handler("generate_schedule")
+def _generate_schedule_job(db: Session, user_id: int, params: dict, progress):
+    params = dict(params)
+    if params.get("end_date"):
+        params["end_date"] = datetime.fromisoformat(params["end_date"])
+    return generate_user_schedule(db, user_id, **params)
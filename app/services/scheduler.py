@@ -1,90 +1,177 @@
+from bisect import bisect_right
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-import math
+from typing import List, Dict, Optional, Iterable, Tuple
+
+BLOCK_MINUTES = 90
+MIN_BLOCK_MINUTES = 15
+MAX_HORIZON_DAYS = 366
+
+PRIORITY_ORDER = {"high": 0, "urgent": 0, "medium": 1, "low": 2}
+
+
+class FreeSlots:
+    """
+    Sorted, disjoint free intervals. Lookups are a bisect over the interval ends;
+    fragments too short to hold a study block are dropped when time is reserved,
+    so the first interval found after a point in time is always usable.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime]], min_length: timedelta):
+        self.min_length = min_length
+        self.starts = []
+        self.ends = []
+        for start, end in intervals:
+            if end - start >= min_length:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def first_fit(self, earliest: datetime, until: datetime):
+        """Index and clipped bounds of the first usable interval at or after `earliest`"""
+        i = bisect_right(self.ends, earliest)
+        while i < len(self.starts):
+            start = max(self.starts[i], earliest)
+            if start >= until:
+                return None
+            end = min(self.ends[i], until)
+            if end - start >= self.min_length or self.ends[i] > until:
+                return i, start, end
+            i += 1
+        return None
+
+    def interval_at(self, moment: datetime):
+        """Index of the interval starting exactly at `moment`, if any"""
+        i = bisect_right(self.starts, moment) - 1
+        if i >= 0 and self.starts[i] == moment:
+            return i
+        return None
+
+    def reserve(self, i: int, start: datetime, end: datetime):
+        pieces = []
+        if start - self.starts[i] >= self.min_length:
+            pieces.append((self.starts[i], start))
+        if self.ends[i] - end >= self.min_length:
+            pieces.append((end, self.ends[i]))
+        self.starts[i:i + 1] = [p[0] for p in pieces]
+        self.ends[i:i + 1] = [p[1] for p in pieces]
+
+
+def round_up(moment: datetime, minutes: int) -> datetime:
+    floored = moment.replace(minute=moment.minute - moment.minute % minutes, second=0, microsecond=0)
+    return floored if floored == moment else floored + timedelta(minutes=minutes)
+
+
+def working_windows(start: datetime, end: datetime, day_start_hour: int, day_end_hour: int):
+    """Daily [day_start_hour, day_end_hour) windows between start and end"""
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        window_start = max(day + timedelta(hours=day_start_hour), start)
+        window_end = min(day + timedelta(hours=day_end_hour), end)
+        if window_start < window_end:
+            yield window_start, window_end
+        day += timedelta(days=1)
+
+
+def merge_intervals(intervals):
+    """Sort intervals and merge the overlapping ones"""
+    merged = []
+    for start, end in sorted((s, e) for s, e in intervals if s and e and s < e):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(windows, busy):
+    """Remove busy intervals (any order, may overlap) from sorted windows"""
+    busy = merge_intervals(busy)
+    j = 0
+    for start, end in windows:
+        while j < len(busy) and busy[j][1] <= start:
+            j += 1
+        cursor = start
+        k = j
+        while k < len(busy) and busy[k][0] < end:
+            if busy[k][0] > cursor:
+                yield cursor, busy[k][0]
+            cursor = max(cursor, busy[k][1])
+            k += 1
+        if cursor < end:
+            yield cursor, end
+
 
 def generate_schedule_from_tasks(
-    tasks, 
+    tasks,
     user_id: int,
     end_date: Optional[datetime] = None,
     short_break_minutes: int = 5,
     medium_break_minutes: int = 15,
     long_break_minutes: int = 30,
     long_break_after_minutes: int = 90,
+    busy: Optional[Iterable[Tuple[datetime, datetime]]] = None,
+    day_start_hour: int = 9,
+    day_end_hour: int = 18,
+    now: Optional[datetime] = None,
 ) -> List[Dict]:
     """
     Algorithm:
-    1. Sort tasks by deadline (earliest first), then by priority (high first)
-    2. Calculate total study hours needed per task
-    3. Create 90-minute study blocks with breaks in between
-    4. Schedule blocks across days before deadline
-    5. For tasks with same deadline, distribute work evenly across available time
-    6. Add short breaks between study blocks
-    7. Add medium breaks within long tasks
-    8. Add long breaks between different tasks
+    1. Sort tasks by deadline (earliest first), then by priority (high first), then id
+    2. Build the free time: daily working hours from now until the latest deadline,
+       minus the user's busy intervals (existing manual schedule entries)
+    3. For each task, place up to 90-minute study blocks in the earliest free slots
+       that end before its deadline (or end_date, when given)
+    4. Reserve a break right after each block: medium within long tasks,
+       short otherwise, and a long break after the last block of a task
+    The output depends only on the arguments, so the same input gives the same schedule.
     """
-    
+
     if not tasks:
         return []
-    
-    schedule_entries = []
-    now = datetime.utcnow()
-    
-    priority_order = {"high": 0, "urgent": 0, "medium": 1, "low": 2}
+
+    now = now or datetime.utcnow()
+    earliest = round_up(now, 15)
+
     sorted_tasks = sorted(
-        tasks, 
+        (t for t in tasks if t.deadline and t.deadline > now),
         key=lambda t: (
-            t.deadline or datetime.max,
-            priority_order.get(t.priority, 2)
+            t.deadline,
+            PRIORITY_ORDER.get(t.priority, 2),
+            t.id or 0
         )
     )
-    
-    # track the current scheduling position
-    current_scheduling_time = now.replace(hour=9, minute=0, second=0, microsecond=0)
-    
+    if not sorted_tasks:
+        return []
+
+    horizon = end_date or sorted_tasks[-1].deadline
+    horizon = min(horizon, now + timedelta(days=MAX_HORIZON_DAYS))
+
+    windows = working_windows(earliest, horizon, day_start_hour, day_end_hour)
+    slots = FreeSlots(subtract_intervals(windows, busy or []), timedelta(minutes=MIN_BLOCK_MINUTES))
+
+    schedule_entries = []
+
     for task_idx, task in enumerate(sorted_tasks):
-        if not task.deadline or task.deadline <= now:
-            continue
-        
-        schedule_until = end_date if end_date else task.deadline
-        
-        # calculate study blocks needed
-        total_minutes = task.estimated_minutes or 120
-        block_minutes = 90
-        num_blocks = math.ceil(total_minutes / block_minutes)
-        minutes_scheduled = 0
-        
-        # create schedule entries for each block
-        for block_num in range(num_blocks):
-            start_time = current_scheduling_time
-            remaining_minutes = total_minutes - minutes_scheduled
-            block_duration = min(block_minutes, remaining_minutes)
-            end_time = start_time + timedelta(minutes=block_duration)
-            
-            # check if this block fits before the deadline/end_date
-            if start_time >= schedule_until:
+        schedule_until = min(end_date if end_date else task.deadline, horizon)
+        remaining = timedelta(minutes=task.estimated_minutes or 120)
+        cursor = earliest
+        blocks = []
+
+        while remaining > timedelta(0):
+            fit = slots.first_fit(cursor, schedule_until)
+            if fit is None:
                 break
-            
-            # if end time exceeds deadline, truncate it
-            if end_time > schedule_until:
-                end_time = schedule_until
-            
-            schedule_entries.append({
-                "title": f"{task.title}",
-                "description": f"Blok {block_num + 1} z {num_blocks}",
-                "start_time": start_time,
-                "end_time": end_time,
-                "task_id": task.id,
-                "subject_id": task.subject_id,
-                "user_id": user_id,
-                "color": get_priority_color(task.priority)
-            })
-            
-            minutes_scheduled += block_duration
-            
-            # add break after this block
-            if block_num < num_blocks - 1:
-                # within-task break: use medium break for long tasks
-                if block_duration >= long_break_after_minutes:
+            slot_idx, start_time, slot_end = fit
+
+            end_time = start_time + min(timedelta(minutes=BLOCK_MINUTES), remaining, slot_end - start_time)
+            slots.reserve(slot_idx, start_time, end_time)
+            blocks.append((start_time, end_time))
+            remaining -= end_time - start_time
+            cursor = end_time
+
+            if remaining > timedelta(0):
+                # within-task break: use medium break for long blocks
+                if end_time - start_time >= timedelta(minutes=long_break_after_minutes):
                     break_minutes = medium_break_minutes
                 else:
                     break_minutes = short_break_minutes
@@ -93,31 +180,40 @@ def generate_schedule_from_tasks(
                 break_minutes = long_break_minutes
             else:
                 break_minutes = 0
-            
-            if break_minutes > 0:
-                break_start = end_time
-                break_end = break_start + timedelta(minutes=break_minutes)
-                
-                # only add break if it fits before schedule_until
-                if break_start < schedule_until:
+
+            # a break only makes sense right after the block, inside the same free stretch
+            following = slots.interval_at(end_time) if break_minutes > 0 else None
+            if following is not None:
+                break_end = min(end_time + timedelta(minutes=break_minutes), slots.ends[following], schedule_until)
+                if break_end > end_time:
+                    slots.reserve(following, end_time, break_end)
                     schedule_entries.append({
                         "title": "Przerwa",
                         "description": f"{break_minutes}-min przerwy",
-                        "start_time": break_start,
-                        "end_time": min(break_end, schedule_until),
+                        "start_time": end_time,
+                        "end_time": break_end,
                         "task_id": None,
                         "subject_id": None,
                         "user_id": user_id,
-                        "color": "gray"
+                        "color": "gray",
+                        "is_generated": True,
                     })
-                    current_scheduling_time = break_end
-            else:
-                current_scheduling_time = end_time
-            
-            # if next block would be after 18:00, move to next day at 9:00
-            if current_scheduling_time.hour >= 18:
-                current_scheduling_time = (current_scheduling_time + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
-    
+                    cursor = break_end
+
+        for block_num, (start_time, end_time) in enumerate(blocks):
+            schedule_entries.append({
+                "title": f"{task.title}",
+                "description": f"Blok {block_num + 1} z {len(blocks)}",
+                "start_time": start_time,
+                "end_time": end_time,
+                "task_id": task.id,
+                "subject_id": task.subject_id,
+                "user_id": user_id,
+                "color": get_priority_color(task.priority),
+                "is_generated": True,
+            })
+
+    schedule_entries.sort(key=lambda e: (e["start_time"], e["end_time"]))
     return schedule_entries
 
 def get_priority_color(priority: str) -> str:
@@ -128,4 +224,3 @@ def get_priority_color(priority: str) -> str:
         "urgent": "red"
     }
     return color_map.get(priority, "blue")
-
@@ -1,147 +1,200 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.task import Task, TaskStatus
-from app.models.schedule import Schedule
-from sqlalchemy import func
+from app.services import activity
+from app.services.rollups import load_daily_stats, load_daily_stats_async, load_user_stats, load_user_stats_async
+from app.services.subjects import get_user_subjects_with_stats, get_user_subjects_with_stats_async
+from sqlalchemy import func, case, select
 
-def completion_percentage(tasks):
-    if not tasks:
+def completion_rate(completed: int, total: int):
+    if not total:
         return 0
+    return round(completed / total * 100, 2)
+
+def completion_percentage(tasks):
     done = len([t for t in tasks if t.status == TaskStatus.done])
-    return round(done / len(tasks) * 100, 2)
+    return completion_rate(done, len(tasks))
 
-def get_user_statistics(db: Session, user_id: int):
-    from app.models.subject import Subject
-    
-    tasks = db.query(Task).join(Subject).filter(Subject.user_id == user_id).all()
-    
-    total_tasks = len(tasks)
-    completed_tasks = len([t for t in tasks if t.status == TaskStatus.done])
-    completion_rate = completion_percentage(tasks)
-    
-    total_minutes = sum([t.estimated_minutes for t in tasks if t.estimated_minutes])
-    total_hours = round(total_minutes / 60, 2)
-    
+def _this_week():
     now = datetime.utcnow()
     week_start = now - timedelta(days=now.weekday())
-    week_end = week_start + timedelta(days=7)
-    
-    tasks_this_week = [t for t in tasks if t.deadline and week_start <= t.deadline <= week_end]
-    completed_this_week = [t for t in tasks_this_week if t.status == TaskStatus.done]
-    
-    study_streak = calculate_study_streak(db, user_id)
+    return now, week_start, week_start + timedelta(days=7)
+
+def week_counts_select(user_id: int, week_start: datetime, week_end: datetime):
+    # the week window is the only part not covered by the rollup row
+    return select(
+        func.count(Task.id),
+        func.count(case((Task.status == TaskStatus.done, Task.id))),
+    ).where(
+        Task.user_id == user_id,
+        Task.deadline >= week_start,
+        Task.deadline <= week_end
+    )
+
+def _format_statistics(stats, tasks_this_week: int, completed_this_week: int, now: datetime):
+    total_tasks = stats.total_tasks
+    completed_tasks = stats.done_tasks
     
-    schedules = db.query(Schedule).filter(Schedule.user_id == user_id).all()
-    total_scheduled_minutes = sum([(s.end_time - s.start_time).total_seconds() / 60 for s in schedules])
-    total_scheduled_hours = round(total_scheduled_minutes / 60, 2)
+    bits = activity.load_bits(stats.activity_bitmap)
     
     return {
         "total_tasks": total_tasks,
         "completed_tasks": completed_tasks,
-        "completion_rate": completion_rate,
-        "total_estimated_hours": total_hours,
-        "total_scheduled_hours": total_scheduled_hours,
-        "tasks_this_week": len(tasks_this_week),
-        "completed_this_week": len(completed_this_week),
-        "study_streak": study_streak,
-        "pending_tasks": len([t for t in tasks if t.status == TaskStatus.todo]),
-        "in_progress_tasks": len([t for t in tasks if t.status == TaskStatus.in_progress])
+        "completion_rate": completion_rate(completed_tasks, total_tasks),
+        "total_estimated_hours": round(stats.total_estimated_minutes / 60, 2),
+        "total_scheduled_hours": round(stats.total_scheduled_seconds / 3600, 2),
+        "tasks_this_week": tasks_this_week,
+        "completed_this_week": completed_this_week,
+        "study_streak": activity.current_streak(stats.activity_epoch, bits, now.date()),
+        "longest_streak": activity.longest_streak(bits),
+        "pending_tasks": stats.todo_tasks,
+        "in_progress_tasks": stats.in_progress_tasks
     }
 
+def get_user_statistics(db: Session, user_id: int):
+    stats = load_user_stats(db, user_id)
+    now, week_start, week_end = _this_week()
+    tasks_this_week, completed_this_week = db.execute(week_counts_select(user_id, week_start, week_end)).one()
+    return _format_statistics(stats, tasks_this_week, completed_this_week, now)
+
+async def get_user_statistics_async(db: AsyncSession, user_id: int):
+    stats = await load_user_stats_async(db, user_id)
+    now, week_start, week_end = _this_week()
+    tasks_this_week, completed_this_week = (await db.execute(week_counts_select(user_id, week_start, week_end))).one()
+    return _format_statistics(stats, tasks_this_week, completed_this_week, now)
+
+def get_completion_percentage(db: Session, user_id: int):
+    stats = load_user_stats(db, user_id)
+    return completion_rate(stats.done_tasks, stats.total_tasks)
+
+async def get_completion_percentage_async(db: AsyncSession, user_id: int):
+    stats = await load_user_stats_async(db, user_id)
+    return completion_rate(stats.done_tasks, stats.total_tasks)
+
 def calculate_study_streak(db: Session, user_id: int) -> int:
     """Calculate consecutive days with completed tasks (counting today as day 1)"""
-    from app.models.subject import Subject
-    
-    tasks = db.query(Task).join(Subject).filter(
-        Subject.user_id == user_id,
-        Task.status == TaskStatus.done
-    ).order_by(Task.completed_at.desc()).all()
-    
-    if not tasks:
-        return 0
-    
-    # Get unique dates with completed tasks, most recent first
-    completed_dates = []
-    seen_dates = set()
-    for task in tasks:
-        if task.completed_at:
-            task_date = task.completed_at.date()
-            if task_date not in seen_dates:
-                completed_dates.append(task_date)
-                seen_dates.add(task_date)
-    
-    if not completed_dates:
-        return 0
-    
-    # Check if the most recent completion is today or yesterday
+    stats = load_user_stats(db, user_id)
+    return activity.current_streak(stats.activity_epoch, activity.load_bits(stats.activity_bitmap), datetime.utcnow().date())
+
+def calculate_longest_streak(db: Session, user_id: int) -> int:
+    stats = load_user_stats(db, user_id)
+    return activity.longest_streak(activity.load_bits(stats.activity_bitmap))
+
+def _check_range(start: date, end: date):
+    if start > end:
+        raise HTTPException(status_code=400, detail="Start date must not be after end date")
+
+def _heatmap(stats, start: date, end: date):
+    bits = activity.load_bits(stats.activity_bitmap)
+    return {
+        "start": start,
+        "end": end,
+        "active_days": activity.active_days(stats.activity_epoch, bits, start, end),
+        "active_dates": activity.active_dates(stats.activity_epoch, bits, start, end),
+    }
+
+def get_activity_heatmap(db: Session, user_id: int, start: date, end: date):
+    """Days with at least one completed task in start..end, from the activity bitmap"""
+    _check_range(start, end)
+    return _heatmap(load_user_stats(db, user_id), start, end)
+
+async def get_activity_heatmap_async(db: AsyncSession, user_id: int, start: date, end: date):
+    _check_range(start, end)
+    return _heatmap(await load_user_stats_async(db, user_id), start, end)
+
+GRANULARITIES = ("day", "week", "month")
+MAX_TIMESERIES_DAYS = 3660
+
+def _bucket_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+def _next_bucket(bucket: date, granularity: str) -> date:
+    if granularity == "week":
+        return bucket + timedelta(days=7)
+    if granularity == "month":
+        return (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return bucket + timedelta(days=1)
+
+def _check_time_series(start: date, end: date, granularity: str):
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail="Granularity must be one of: day, week, month")
+    _check_range(start, end)
+    if (end - start).days >= MAX_TIMESERIES_DAYS:
+        raise HTTPException(status_code=400, detail="Date range is too long")
+
+def _time_series(daily_rows, start: date, end: date, granularity: str):
+    buckets = {}
+    bucket = _bucket_start(start, granularity)
+    while bucket <= end:
+        buckets[bucket] = {"tasks_completed": 0, "actual_minutes": 0, "scheduled_seconds": 0}
+        bucket = _next_bucket(bucket, granularity)
+    
+    for row in daily_rows:
+        totals = buckets[_bucket_start(row.day, granularity)]
+        totals["tasks_completed"] += row.tasks_completed
+        totals["actual_minutes"] += row.actual_minutes
+        totals["scheduled_seconds"] += row.scheduled_seconds
+    
+    return [
+        {
+            "period_start": bucket,
+            "tasks_completed": totals["tasks_completed"],
+            "hours_studied": round(totals["actual_minutes"] / 60, 2),
+            "hours_scheduled": round(totals["scheduled_seconds"] / 3600, 2),
+        }
+        for bucket, totals in buckets.items()
+    ]
+
+def get_time_series(db: Session, user_id: int, start: date, end: date, granularity: str = "day"):
+    """Completion and study-time series for start..end (inclusive) from the daily rollups"""
+    _check_time_series(start, end, granularity)
+    return _time_series(load_daily_stats(db, user_id, start, end), start, end, granularity)
+
+async def get_time_series_async(db: AsyncSession, user_id: int, start: date, end: date, granularity: str = "day"):
+    _check_time_series(start, end, granularity)
+    return _time_series(await load_daily_stats_async(db, user_id, start, end), start, end, granularity)
+
+def _current_week():
     today = datetime.utcnow().date()
-    if completed_dates[0] != today and completed_dates[0] != today - timedelta(days=1):
-        return 0
-    
-    # Count consecutive days from most recent backwards
-    streak = 1
-    for i in range(1, len(completed_dates)):
-        expected_date = completed_dates[0] - timedelta(days=i)
-        if completed_dates[i] == expected_date:
-            streak += 1
-        else:
-            break
-    
-    return streak
+    week_start = today - timedelta(days=today.weekday())
+    return week_start, week_start + timedelta(days=6)
+
+def _weekly_progress(series):
+    return [
+        {
+            "day": point["period_start"].strftime("%A"),
+            "tasks_completed": point["tasks_completed"],
+            "hours_studied": point["hours_studied"]
+        }
+        for point in series
+    ]
 
 def get_weekly_progress(db: Session, user_id: int):
-    from app.models.subject import Subject
-    
-    now = datetime.utcnow()
-    # Use date arithmetic to get midnight on Monday
-    week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    daily_stats = []
-    
-    for day_offset in range(7):
-        day_start = week_start + timedelta(days=day_offset)
-        day_end = day_start + timedelta(days=1)
-        
-        day_name = day_start.strftime("%A")
-        
-        # Count tasks completed on this day based on completed_at timestamp
-        completed_tasks = db.query(Task).join(Subject).filter(
-            Subject.user_id == user_id,
-            Task.status == TaskStatus.done,
-            Task.completed_at >= day_start,
-            Task.completed_at < day_end
-        ).all()
-        
-        tasks_completed = len(completed_tasks)
-        
-        # Calculate actual hours from completed tasks
-        total_actual_minutes = sum([t.actual_minutes for t in completed_tasks if t.actual_minutes]) if completed_tasks else 0
-        actual_hours = total_actual_minutes / 60 if total_actual_minutes > 0 else 0.0
-        
-        daily_stats.append({
-            "day": day_name,
-            "tasks_completed": tasks_completed,
-            "hours_studied": round(float(actual_hours), 2)
-        })
-    
-    return daily_stats
+    return _weekly_progress(get_time_series(db, user_id, *_current_week(), "day"))
+
+async def get_weekly_progress_async(db: AsyncSession, user_id: int):
+    return _weekly_progress(await get_time_series_async(db, user_id, *_current_week(), "day"))
+
+def _subject_breakdown(subjects):
+    return [
+        {
+            "subject_name": subject["name"],
+            "total_tasks": subject["task_count"],
+            "completed_tasks": subject["completed_tasks"],
+            "completion_rate": completion_rate(subject["completed_tasks"], subject["task_count"])
+        }
+        for subject in subjects
+    ]
 
 def get_subject_breakdown(db: Session, user_id: int):
     """Get task breakdown by subject"""
-    from app.models.subject import Subject
-    
-    subjects = db.query(Subject).filter(Subject.user_id == user_id).all()
-    breakdown = []
-    
-    for subject in subjects:
-        tasks = db.query(Task).filter(Task.subject_id == subject.id).all()
-        completed = len([t for t in tasks if t.status == TaskStatus.done])
-        
-        breakdown.append({
-            "subject_name": subject.name,
-            "total_tasks": len(tasks),
-            "completed_tasks": completed,
-            "completion_rate": completion_percentage(tasks) if tasks else 0
-        })
-    
-    return breakdown
+    return _subject_breakdown(get_user_subjects_with_stats(db, user_id))
+
+async def get_subject_breakdown_async(db: AsyncSession, user_id: int):
+    return _subject_breakdown(await get_user_subjects_with_stats_async(db, user_id))
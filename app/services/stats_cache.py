@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.cache import DictStore, LRUBackend, NullBackend, SharedBackend
+from app.core.config import STATS_CACHE_BACKEND, STATS_CACHE_SIZE, STATS_CACHE_TTL_SECONDS, STATS_CACHE_STALE_SECONDS
+from app.core.metrics import Counter, Gauge
+from app.database.session import SessionLocal
+from app.services import stats
+from app.services.rollups import load_data_version, load_data_version_async
+
+logger = logging.getLogger(__name__)
+
+stats_cache_requests = Counter("stats_cache_requests_total", "Statistics cache lookups by result (hit, stale, miss)", ["endpoint", "result"])
+stats_cache_hit_ratio = Gauge("stats_cache_hit_ratio", "Share of statistics cache lookups served from the cache", ["endpoint"])
+
+# endpoint -> (sync service, async service)
+CACHED_SERVICES = {
+    "overview": (stats.get_user_statistics, stats.get_user_statistics_async),
+    "weekly": (stats.get_weekly_progress, stats.get_weekly_progress_async),
+    "subjects": (stats.get_subject_breakdown, stats.get_subject_breakdown_async),
+    "completion": (stats.get_completion_percentage, stats.get_completion_percentage_async),
+}
+
+
+def make_backend(name: str):
+    if name == "none":
+        return NullBackend()
+    if name == "shared":
+        # swap DictStore for a real client (e.g. redis.Redis) in multi-process deployments
+        return SharedBackend(DictStore(), namespace="stats")
+    return LRUBackend(STATS_CACHE_SIZE)
+
+
+backend = make_backend(STATS_CACHE_BACKEND)
+
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="stats-cache")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _key(user_id: int, endpoint: str, version: int):
+    # Keyed by data version, so a value computed before a write can never be served after it.
+    # The day is part of the key for the same reason as in the ETags.
+    return (user_id, endpoint, version, datetime.utcnow().date().isoformat())
+
+
+def _lookup(endpoint: str, key: tuple):
+    entry = backend.get(key)
+    if entry is None:
+        result = "miss"
+    elif entry["fresh_until"] > time.time():
+        result = "hit"
+    else:
+        result = "stale"
+
+    stats_cache_requests.inc(endpoint=endpoint, result=result)
+    served = stats_cache_requests.value(endpoint=endpoint, result="hit") + stats_cache_requests.value(endpoint=endpoint, result="stale")
+    stats_cache_hit_ratio.set(served / (served + stats_cache_requests.value(endpoint=endpoint, result="miss")), endpoint=endpoint)
+    return entry, result
+
+
+def _store(key: tuple, value):
+    entry = {"value": value, "fresh_until": time.time() + STATS_CACHE_TTL_SECONDS}
+    backend.set(key, entry, STATS_CACHE_TTL_SECONDS + STATS_CACHE_STALE_SECONDS)
+
+
+def _revalidate(endpoint: str, user_id: int, key: tuple):
+    """Recompute a stale entry in the background; at most one refresh per key at a time"""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    _refresh_executor.submit(_refresh, endpoint, user_id, key)
+
+
+def _refresh(endpoint: str, user_id: int, key: tuple):
+    db = SessionLocal()
+    try:
+        _store(key, CACHED_SERVICES[endpoint][0](db, user_id))
+    except Exception:
+        logger.exception("Refreshing cached %s statistics for user %s failed", endpoint, user_id)
+    finally:
+        db.close()
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def get_cached(db: Session, endpoint: str, user_id: int, version: int = None):
+    """
+    Serve a statistics endpoint from the cache. Fresh entries are returned as is;
+    entries past their TTL (but of the current data version) are returned while
+    a background refresh runs; only a miss computes in the request. Pass the
+    data version when the caller already has it (the ETag check reads it).
+    """
+    if version is None:
+        version = load_data_version(db, user_id)
+    key = _key(user_id, endpoint, version)
+    entry, result = _lookup(endpoint, key)
+    if result == "stale":
+        _revalidate(endpoint, user_id, key)
+    if entry is not None:
+        return entry["value"]
+
+    value = CACHED_SERVICES[endpoint][0](db, user_id)
+    _store(key, value)
+    return value
+
+
+async def get_cached_async(db: AsyncSession, endpoint: str, user_id: int, version: int = None):
+    if version is None:
+        version = await load_data_version_async(db, user_id)
+    key = _key(user_id, endpoint, version)
+    entry, result = _lookup(endpoint, key)
+    if result == "stale":
+        _revalidate(endpoint, user_id, key)
+    if entry is not None:
+        return entry["value"]
+
+    value = await CACHED_SERVICES[endpoint][1](db, user_id)
+    _store(key, value)
+    return value
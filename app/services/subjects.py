@@ -1,11 +1,16 @@
 from fastapi import HTTPException
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.subject import Subject
+from app.models.task import Task, TaskStatus
+from app.services.rollups import bump_data_version
 
 
 def create_subject(db: Session, user_id: int, name: str, description: str = None):
     subject = Subject(name=name, description=description, user_id=user_id)
     db.add(subject)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(subject)
     return subject
@@ -15,6 +20,29 @@ def get_user_subjects(db: Session, user_id: int):
     return db.query(Subject).filter(Subject.user_id == user_id).all()
 
 
+def subjects_with_stats_select(user_id: int):
+    """Subjects with their task counts by status, as one grouped aggregate query"""
+    return select(
+        Subject.id,
+        Subject.name,
+        Subject.description,
+        func.count(Task.id).label("task_count"),
+        func.count(case((Task.status == TaskStatus.todo, Task.id))).label("todo_tasks"),
+        func.count(case((Task.status == TaskStatus.in_progress, Task.id))).label("in_progress_tasks"),
+        func.count(case((Task.status == TaskStatus.done, Task.id))).label("completed_tasks"),
+    ).outerjoin(Task, Task.subject_id == Subject.id).where(
+        Subject.user_id == user_id
+    ).group_by(Subject.id).order_by(Subject.id)
+
+
+def get_user_subjects_with_stats(db: Session, user_id: int):
+    return [dict(row._mapping) for row in db.execute(subjects_with_stats_select(user_id))]
+
+
+async def get_user_subjects_with_stats_async(db: AsyncSession, user_id: int):
+    return [dict(row._mapping) for row in await db.execute(subjects_with_stats_select(user_id))]
+
+
 def get_subject_by_id(db: Session, subject_id: int, user_id: int):
     subject = db.query(Subject).filter(
         Subject.id == subject_id,
@@ -32,6 +60,7 @@ def update_subject(db: Session, subject_id: int, user_id: int, update_data: dict
         if value is not None:
             setattr(subject, key, value)
     
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(subject)
     return subject
@@ -40,5 +69,6 @@ def update_subject(db: Session, subject_id: int, user_id: int, update_data: dict
 def delete_subject(db: Session, subject_id: int, user_id: int):
     subject = get_subject_by_id(db, subject_id, user_id)
     db.delete(subject)
+    bump_data_version(db, user_id)
     db.commit()
     return {"ok": True}
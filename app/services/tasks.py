@@ -1,65 +1,194 @@
+import base64
+import csv
+import io
+import json
 from datetime import datetime
+from types import SimpleNamespace
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from app.core.config import TASK_PAGE_MAX, TASK_PAGE_SIZE
 from app.models.subject import Subject
 from app.models.task import Task, TaskStatus
+from app.services.rollups import record_task_change, record_task_changes, task_snapshot
 
 
-def create_task(db: Session, user_id: int, task_data: dict):
+def get_owned_subject(db: Session, subject_id: int, user_id: int) -> Subject:
     subject = db.query(Subject).filter(
-        Subject.id == task_data.get('subject_id'),
+        Subject.id == subject_id,
         Subject.user_id == user_id
     ).first()
     if not subject:
         raise HTTPException(status_code=403, detail="Subject not found or access denied")
+    return subject
+
+
+def create_task(db: Session, user_id: int, task_data: dict):
+    subject = get_owned_subject(db, task_data.get('subject_id'), user_id)
     
-    db_task = Task(**task_data, status="todo")
+    db_task = Task(**task_data, user_id=subject.user_id, status="todo")
     db.add(db_task)
+    record_task_change(db, user_id, None, task_snapshot(db_task))
     db.commit()
     db.refresh(db_task)
     return db_task
 
 
-def list_user_tasks(db: Session, user_id: int, status: str = None):
-    query = db.query(Task).join(Subject).filter(Subject.user_id == user_id)
+TASK_FIELDS = {
+    "id": Task.id,
+    "title": Task.title,
+    "description": Task.description,
+    "priority": Task.priority,
+    "deadline": Task.deadline,
+    "estimated_minutes": Task.estimated_minutes,
+    "actual_minutes": Task.actual_minutes,
+    "status": Task.status,
+    "subject_id": Task.subject_id,
+    "completed_at": Task.completed_at,
+    "created_at": Task.created_at,
+    "updated_at": Task.updated_at,
+    "subject_name": Subject.name,
+}
+
+
+def parse_task_fields(fields: str = None) -> list:
+    if not fields:
+        return list(TASK_FIELDS)
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in TASK_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown task fields: {', '.join(unknown)}")
+    return selected
+
+
+def encode_task_cursor(deadline: datetime, task_id: int) -> str:
+    payload = json.dumps([deadline.isoformat() if deadline else None, task_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_task_cursor(cursor: str):
+    try:
+        deadline, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (datetime.fromisoformat(deadline) if deadline else None), int(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def task_list_select(
+    user_id: int,
+    selected: list,
+    status: str = None,
+    subject_id: int = None,
+    priority: str = None,
+    deadline_from: datetime = None,
+    deadline_to: datetime = None,
+    limit: int = None,
+    cursor: str = None,
+):
+    """The task list statement, shared by the sync and async services"""
+    # the keyset columns are always fetched so the next cursor can be built
+    columns = [TASK_FIELDS[f].label(f) for f in selected]
+    columns += [TASK_FIELDS[f].label(f) for f in ("deadline", "id") if f not in selected]
+
+    stmt = select(*columns).select_from(Task).where(Task.user_id == user_id)
+    if "subject_name" in selected:
+        stmt = stmt.outerjoin(Subject, Task.subject_id == Subject.id)
     
     if status:
-        query = query.filter(Task.status == status)
+        stmt = stmt.where(Task.status == status)
+    if subject_id:
+        stmt = stmt.where(Task.subject_id == subject_id)
+    if priority:
+        stmt = stmt.where(Task.priority == priority)
+    if deadline_from:
+        stmt = stmt.where(Task.deadline >= deadline_from)
+    if deadline_to:
+        stmt = stmt.where(Task.deadline <= deadline_to)
     
-    tasks = query.order_by(Task.deadline).all()
+    if cursor:
+        last_deadline, last_id = decode_task_cursor(cursor)
+        if last_deadline is None:
+            stmt = stmt.where(Task.deadline.is_(None), Task.id > last_id)
+        else:
+            stmt = stmt.where(or_(
+                Task.deadline > last_deadline,
+                and_(Task.deadline == last_deadline, Task.id > last_id),
+                Task.deadline.is_(None),
+            ))
     
-    result = []
-    for task in tasks:
-        task_dict = format_task_response(task)
-        result.append(task_dict)
+    stmt = stmt.order_by(Task.deadline.asc().nulls_last(), Task.id.asc())
+    if limit:
+        stmt = stmt.limit(limit + 1)
+    return stmt
+
+
+def _page_size(limit: int = None) -> int:
+    return min(limit or TASK_PAGE_SIZE, TASK_PAGE_MAX)
+
+
+def _task_page(rows, selected: list, limit: int):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_task_cursor(rows[-1].deadline, rows[-1].id)
     
-    return result
+    return [{f: getattr(row, f) for f in selected} for row in rows], next_cursor
+
+
+def list_user_tasks(db: Session, user_id: int, fields: str = None, limit: int = None, **filters):
+    """
+    One page of tasks ordered by (deadline, id), keyset-paginated: limit
+    defaults to TASK_PAGE_SIZE and is capped at TASK_PAGE_MAX, so the cost does
+    not grow with the user's history. Filters: status, subject_id, priority,
+    deadline_from, deadline_to, cursor.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    selected = parse_task_fields(fields)
+    limit = _page_size(limit)
+    rows = db.execute(task_list_select(user_id, selected, limit=limit, **filters)).all()
+    return _task_page(rows, selected, limit)
 
 
-def get_task_by_id(db: Session, task_id: int, user_id: int):
-    task = db.query(Task).join(Subject).filter(
+async def list_user_tasks_async(db: AsyncSession, user_id: int, fields: str = None, limit: int = None, **filters):
+    selected = parse_task_fields(fields)
+    limit = _page_size(limit)
+    rows = (await db.execute(task_list_select(user_id, selected, limit=limit, **filters))).all()
+    return _task_page(rows, selected, limit)
+
+
+def get_task_by_id(db: Session, task_id: int, user_id: int, *options):
+    task = db.query(Task).options(*options).filter(
         Task.id == task_id,
-        Subject.user_id == user_id
+        Task.user_id == user_id
     ).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
 
 
+def get_task_with_subject(db: Session, task_id: int, user_id: int):
+    """A task with its subject joined in, for format_task_response"""
+    return get_task_by_id(db, task_id, user_id, joinedload(Task.subject))
+
+
 def update_task(db: Session, task_id: int, user_id: int, update_data: dict):
     db_task = get_task_by_id(db, task_id, user_id)
+    before = task_snapshot(db_task)
     
     update_dict = {k: v for k, v in update_data.items() if v is not None}
     
-    if 'status' in update_dict:
-        if update_dict['status'] == 'done' and db_task.status != 'done':
-            db_task.completed_at = datetime.utcnow()
-        elif update_dict['status'] != 'done' and db_task.status == 'done':
-            db_task.completed_at = None
+    if 'subject_id' in update_dict and update_dict['subject_id'] != db_task.subject_id:
+        # moving a task is only allowed between the user's own subjects
+        subject = get_owned_subject(db, update_dict['subject_id'], user_id)
+        db_task.user_id = subject.user_id
+    
+    update_dict.update(_completion_change(db_task.status, update_dict.get('status')))
     
     for key, value in update_dict.items():
         setattr(db_task, key, value)
     
+    record_task_change(db, user_id, before, task_snapshot(db_task))
     db.commit()
     db.refresh(db_task)
     return db_task
@@ -67,32 +196,209 @@ def update_task(db: Session, task_id: int, user_id: int, update_data: dict):
 
 def complete_task(db: Session, task_id: int, user_id: int, actual_minutes: int = None):
     db_task = get_task_by_id(db, task_id, user_id)
+    before = task_snapshot(db_task)
     
     db_task.status = "done"
     if actual_minutes is not None:
         db_task.actual_minutes = actual_minutes
     db_task.completed_at = datetime.utcnow()
     
+    record_task_change(db, user_id, before, task_snapshot(db_task))
     db.commit()
     db.refresh(db_task)
     return db_task
 
 
+def _completion_change(current_status, new_status) -> dict:
+    """The completed_at update implied by a status change, if any"""
+    if new_status is None:
+        return {}
+    if new_status == 'done' and current_status != 'done':
+        return {'completed_at': datetime.utcnow()}
+    if new_status != 'done' and current_status == 'done':
+        return {'completed_at': None}
+    return {}
+
+
+def _owned_subject_ids(db: Session, user_id: int, subject_ids) -> set:
+    if not subject_ids:
+        return set()
+    return set(db.scalars(select(Subject.id).where(
+        Subject.id.in_(subject_ids),
+        Subject.user_id == user_id
+    )))
+
+
+def _batch_result(results: list) -> dict:
+    succeeded = sum(1 for r in results if r["ok"])
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+
+def create_tasks_batch(db: Session, user_id: int, items: list):
+    """
+    Create many tasks in one transaction: one ownership query for all subjects,
+    one multi-row INSERT and one rollup update. Items referencing a subject the
+    user does not own are reported as failed; the others are still created.
+    """
+    owned = _owned_subject_ids(db, user_id, {item['subject_id'] for item in items})
+
+    results = []
+    rows = []
+    for index, item in enumerate(items):
+        if item['subject_id'] not in owned:
+            results.append({"index": index, "ok": False, "error": "Subject not found or access denied"})
+            continue
+        results.append({"index": index, "ok": True})
+        rows.append({**item, "user_id": user_id, "status": TaskStatus.todo})
+
+    if rows:
+        ids = db.scalars(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True),
+            rows,
+        ).all()
+        created = iter(ids)
+        for result in results:
+            if result["ok"]:
+                result["id"] = next(created)
+        record_task_changes(db, user_id, [(None, task_snapshot(Task(**row))) for row in rows])
+        db.commit()
+    return _batch_result(results)
+
+
+# columns read to apply an update and compute the rollup snapshots
+_BATCH_COLUMNS = (Task.id, Task.status, Task.subject_id, Task.estimated_minutes, Task.actual_minutes, Task.completed_at)
+
+
+def update_tasks_batch(db: Session, user_id: int, items: list):
+    """
+    Update (or complete, with status "done") many tasks in one transaction.
+    The tasks are read in one query, target subjects checked in another, and
+    all changes written with a bulk UPDATE by primary key and one rollup update.
+    Unknown, foreign or repeated ids and foreign subjects fail only their item.
+    """
+    ids = {item['id'] for item in items}
+    current = {row.id: row for row in db.execute(
+        select(*_BATCH_COLUMNS).where(Task.id.in_(ids), Task.user_id == user_id)
+    )}
+    owned = _owned_subject_ids(db, user_id, {
+        item['subject_id'] for item in items
+        if item.get('subject_id') is not None and item['id'] in current and item['subject_id'] != current[item['id']].subject_id
+    })
+
+    results = []
+    params = []
+    changes = []
+    seen = set()
+    for index, item in enumerate(items):
+        task_id = item['id']
+        row = current.get(task_id)
+        error = None
+        if row is None:
+            error = "Task not found"
+        elif task_id in seen:
+            error = "Task appears more than once in the batch"
+        else:
+            values = {k: v for k, v in item.items() if k != 'id' and v is not None}
+            subject_id = values.get('subject_id')
+            if subject_id is not None and subject_id != row.subject_id and subject_id not in owned:
+                error = "Subject not found or access denied"
+        if error:
+            results.append({"index": index, "id": task_id, "ok": False, "error": error})
+            continue
+
+        seen.add(task_id)
+        values.update(_completion_change(row.status, values.get('status')))
+        if 'status' in values:
+            values['status'] = TaskStatus(values['status'])
+        if values:
+            params.append({"id": task_id, **values})
+            changes.append((task_snapshot(row), task_snapshot(SimpleNamespace(**{**row._asdict(), **values}))))
+        results.append({"index": index, "id": task_id, "ok": True})
+
+    if params:
+        db.execute(update(Task), params)
+        record_task_changes(db, user_id, changes)
+        db.commit()
+    return _batch_result(results)
+
+
 def delete_task(db: Session, task_id: int, user_id: int):
     task = get_task_by_id(db, task_id, user_id)
+    before = task_snapshot(task)
     db.delete(task)
+    record_task_change(db, user_id, before, None)
     db.commit()
     return {"ok": True}
 
 
-def export_tasks_csv(db: Session, user_id: int):
-    tasks = db.query(Task).join(Subject).filter(Subject.user_id == user_id).all()
-    
-    csv_lines = ["title,priority,deadline,status\n"]
-    for task in tasks:
-        csv_lines.append(f"{task.title},{task.priority},{task.deadline},{task.status}\n")
-    
-    return "".join(csv_lines)
+EXPORT_COLUMNS = [
+    "id",
+    "title",
+    "description",
+    "subject_name",
+    "priority",
+    "status",
+    "deadline",
+    "estimated_minutes",
+    "actual_minutes",
+    "completed_at",
+    "created_at",
+    "updated_at",
+]
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_export_rows(db: Session, user_id: int, batch_size: int):
+    """Stream the user's tasks through a server-side cursor, batch_size rows at a time"""
+    query = db.query(*[TASK_FIELDS[c].label(c) for c in EXPORT_COLUMNS]).select_from(Task).outerjoin(
+        Subject, Task.subject_id == Subject.id
+    ).filter(Task.user_id == user_id).order_by(Task.id).yield_per(batch_size)
+
+    for row in query:
+        yield [_export_value(value) for value in row]
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, TaskStatus):
+        return value.value
+    return value
+
+
+def export_tasks_csv(db: Session, user_id: int, batch_size: int = 500):
+    """Yield the user's tasks as CSV chunks; memory stays bounded by one chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    for values in _iter_export_rows(db, user_id, batch_size):
+        writer.writerow(values)
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def export_tasks_ndjson(db: Session, user_id: int, batch_size: int = 500):
+    """Yield the user's tasks as newline-delimited JSON chunks"""
+    lines = []
+    size = 0
+
+    for values in _iter_export_rows(db, user_id, batch_size):
+        line = json.dumps(dict(zip(EXPORT_COLUMNS, values)), ensure_ascii=False)
+        lines.append(line)
+        size += len(line) + 1
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines.clear()
+            size = 0
+
+    if lines:
+        yield "\n".join(lines) + "\n"
 
 
 def format_task_response(task):
@@ -0,0 +1,290 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import event, func
+from app.database.session import SessionLocal, engine
+from app.models.task import Task
+from app.models.user import User
+from app.services import schedule, stats, tasks
+from app.services.scheduler import generate_schedule_from_tasks
+
+# Benchmarks for the service layer and the scheduler, run against the database
+# in DATABASE_URL (local Postgres or SQLite). Each case is timed over several
+# runs, run once more under tracemalloc for its peak allocation, and its SQL
+# statements are counted. The results are compared with the committed
+# baseline.json, which has one section per dialect. Timings are stored as
+# multiples of a fixed pure-Python workload timed on the same machine, so the
+# baseline carries over between machines within the time tolerance:
+#
+#   python seed.py --users 200 --seed 1 --anchor 2026-01-01   (or: --setup)
+#   python -m benchmarks.run                                  (exits 1 on regressions)
+#   python -m benchmarks.run --save-baseline                  (after an intended change, on a known-good tree)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SCHEDULER_SIZES = (10, 1000, 50000)
+NOW = datetime(2026, 1, 5, 8, 0)
+
+
+class Case:
+    def __init__(self, name: str, fn, setup=None, uses_db: bool = True):
+        self.name = name
+        self.fn = fn
+        self.setup = setup
+        self.uses_db = uses_db
+
+
+def synthetic_tasks(count: int, seed: int = 1):
+    """Task-like objects with deadlines spread over the scheduling horizon"""
+    rng = random.Random(seed)
+    return [SimpleNamespace(
+        id=i + 1,
+        title=f"Task {i + 1}",
+        subject_id=rng.randint(1, 10),
+        priority=rng.choice(["low", "medium", "high", "urgent"]),
+        estimated_minutes=rng.choice([30, 45, 60, 90, 120, 180]),
+        deadline=NOW + timedelta(minutes=rng.randint(60, 300 * 24 * 60)),
+    ) for i in range(count)]
+
+
+def scheduler_cases():
+    cases = []
+    for size in SCHEDULER_SIZES:
+        task_list = synthetic_tasks(size)
+        cases.append(Case(
+            f"scheduler.generate[{size}]",
+            lambda db, task_list=task_list: generate_schedule_from_tasks(task_list, 1, now=NOW),
+            uses_db=False,
+        ))
+    return cases
+
+
+def _drain(chunks):
+    return sum(len(chunk) for chunk in chunks)
+
+
+def service_cases(db, user_id: int):
+    today = datetime.utcnow().date()
+    user_tasks = db.query(Task).filter(Task.user_id == user_id).all()
+    # generated around the data rather than the clock, so a dated dataset still yields entries
+    start = min((t.deadline for t in user_tasks if t.deadline), default=datetime.utcnow()) - timedelta(days=1)
+    entries = generate_schedule_from_tasks(user_tasks, user_id, now=start)
+    db.rollback()
+
+    return [
+        Case("tasks.list_user_tasks[page=500]", lambda db: tasks.list_user_tasks(db, user_id, limit=500)),
+        Case("tasks.list_user_tasks[page=50]", lambda db: tasks.list_user_tasks(db, user_id, limit=50)),
+        Case("tasks.list_user_tasks[status]", lambda db: tasks.list_user_tasks(db, user_id, status="todo", limit=50)),
+        Case("tasks.export_tasks_csv", lambda db: _drain(tasks.export_tasks_csv(db, user_id))),
+        Case("stats.get_user_statistics", lambda db: stats.get_user_statistics(db, user_id)),
+        Case("stats.get_completion_percentage", lambda db: stats.get_completion_percentage(db, user_id)),
+        Case("stats.calculate_study_streak", lambda db: stats.calculate_study_streak(db, user_id)),
+        Case("stats.calculate_longest_streak", lambda db: stats.calculate_longest_streak(db, user_id)),
+        Case("stats.get_activity_heatmap[365d]",
+             lambda db: stats.get_activity_heatmap(db, user_id, today - timedelta(days=364), today)),
+        Case("stats.get_time_series[day,90d]",
+             lambda db: stats.get_time_series(db, user_id, today - timedelta(days=89), today)),
+        Case("stats.get_time_series[month,365d]",
+             lambda db: stats.get_time_series(db, user_id, today - timedelta(days=364), today, "month")),
+        Case("stats.get_weekly_progress", lambda db: stats.get_weekly_progress(db, user_id)),
+        Case("stats.get_subject_breakdown", lambda db: stats.get_subject_breakdown(db, user_id)),
+        Case("schedule.create_schedules_from_tasks[insert]",
+             lambda db: schedule.create_schedules_from_tasks(db, user_id, entries),
+             setup=lambda db: schedule.clear_user_schedules(db, user_id)),
+        Case("schedule.create_schedules_from_tasks[unchanged]",
+             lambda db: schedule.create_schedules_from_tasks(db, user_id, entries)),
+    ]
+
+
+def calibrate(repeat: int = 5) -> float:
+    """Median seconds of a fixed workload: the unit timings are stored in"""
+    values = [random.Random(0).random() for _ in range(50000)]
+
+    def once():
+        started = time.perf_counter()
+        rows = [{"id": i, "value": value} for i, value in enumerate(values)]
+        rows.sort(key=lambda row: row["value"])
+        json.dumps(rows[:5000])
+        return time.perf_counter() - started
+
+    once()
+    return statistics.median(once() for _ in range(repeat))
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def run_case(case: Case, repeat: int) -> dict:
+    db = SessionLocal() if case.uses_db else None
+    counter = StatementCounter()
+    try:
+        def once():
+            if case.setup:
+                case.setup(db)
+            counter.count = 0
+            event.listen(engine, "before_cursor_execute", counter)
+            try:
+                started = time.perf_counter()
+                case.fn(db)
+                return time.perf_counter() - started
+            finally:
+                event.remove(engine, "before_cursor_execute", counter)
+                if db is not None:
+                    db.rollback()
+
+        once()  # warm-up: statement caches, lazy imports
+        timings = [once() for _ in range(repeat)]
+        queries = counter.count
+
+        if case.setup:
+            case.setup(db)
+        tracemalloc.start()
+        try:
+            case.fn(db)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            if db is not None:
+                db.rollback()
+    finally:
+        if db is not None:
+            db.close()
+
+    return {
+        "seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        "peak_kib": round(peak / 1024, 1),
+        "queries": queries,
+    }
+
+
+def baseline_entry(result: dict, unit: float) -> dict:
+    return {
+        "time": round(result["seconds"] / unit, 4),
+        "peak_kib": result["peak_kib"],
+        "queries": result["queries"],
+    }
+
+
+def compare(results: dict, baseline: dict, unit: float, time_tolerance: float, memory_tolerance: float) -> list:
+    """
+    Names and reasons of cases slower, hungrier or chattier than the baseline.
+    Times are in units of calibrate(); a millisecond of slack keeps the
+    shortest cases from failing on timer noise.
+    """
+    regressions = []
+    slack = 0.001 / unit
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        units = result["seconds"] / unit
+        if units > base["time"] * (1 + time_tolerance) + slack:
+            regressions.append((name, f"time {base['time'] * unit * 1000:.2f} -> {result['seconds'] * 1000:.2f} ms"))
+        if result["peak_kib"] > base["peak_kib"] * (1 + memory_tolerance) + 64:
+            regressions.append((name, f"peak {base['peak_kib']} -> {result['peak_kib']} KiB"))
+        if result["queries"] > base["queries"]:
+            regressions.append((name, f"queries {base['queries']} -> {result['queries']}"))
+    return regressions
+
+
+def pick_user(db):
+    """The user with the most tasks: the heavy tail is what regresses first"""
+    row = db.query(Task.user_id, func.count(Task.id)).group_by(
+        Task.user_id
+    ).order_by(func.count(Task.id).desc(), Task.user_id).first()
+    return row[0] if row else None
+
+
+def ensure_dataset(db):
+    import seed
+
+    if db.query(User.id).filter(User.email == "user0@example.com").first() is None:
+        print("Generating the benchmark dataset (seed.py --users 200 --seed 1 --anchor 2026-01-01)")
+        seed.generate_dataset(
+            db, users=200, subjects_per_user=5, tasks_per_subject=20, schedules_per_user=20,
+            seed=1, anchor=datetime(2026, 1, 1),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the service layer and scheduler against a stored baseline")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results in the baseline, for this dialect")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--user", type=int, help="user to benchmark (default: the one with most tasks)")
+    parser.add_argument("--setup", action="store_true", help="generate the benchmark dataset when it is missing")
+    parser.add_argument("--time-tolerance", type=float, default=1.0, help="allowed slowdown, 1.0 = 100%%")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25)
+    parser.add_argument("--skip-scheduler", action="store_true")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.setup:
+            ensure_dataset(db)
+        user_id = args.user or pick_user(db)
+        if user_id is None:
+            print("No tasks found: seed the database first (python seed.py --users 200) or pass --setup")
+            return 2
+        cases = ([] if args.skip_scheduler else scheduler_cases()) + service_cases(db, user_id)
+    finally:
+        db.close()
+
+    if args.filter:
+        cases = [c for c in cases if args.filter in c.name]
+
+    unit = calibrate()
+    print(f"{engine.dialect.name}, user {user_id}, median of {args.repeat}, time unit {unit * 1000:.2f} ms")
+    print(f"{'case':<52} {'ms':>9} {'units':>9} {'peak KiB':>10} {'queries':>8}")
+    results = {}
+    for case in cases:
+        result = run_case(case, args.repeat)
+        results[case.name] = result
+        print(f"{case.name:<52} {result['seconds'] * 1000:9.2f} {result['seconds'] / unit:9.3f} "
+              f"{result['peak_kib']:10.1f} {result['queries']:8d}")
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    if args.save_baseline:
+        section = baselines.setdefault(engine.dialect.name, {"results": {}})
+        section["date"] = date.today().isoformat()
+        section["results"].update({name: baseline_entry(result, unit) for name, result in results.items()})
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline for {engine.dialect.name} written to {args.baseline}")
+        return 0
+
+    if engine.dialect.name not in baselines:
+        print(f"No baseline for {engine.dialect.name} in {args.baseline}: run with --save-baseline")
+        return 2
+    regressions = compare(
+        results, baselines[engine.dialect.name]["results"], unit, args.time_tolerance, args.memory_tolerance
+    )
+
+    for name, reason in regressions:
+        print(f"REGRESSION {name}: {reason}")
+    if regressions:
+        return 1
+    print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from fastapi.encoders import jsonable_encoder
+from app.core.responses import ORJSONResponse, json_response
+from app.schemas.schedule import ScheduleList, ScheduleOut
+from app.schemas.task import TaskStatus
+
+# Compares the old response path (jsonable_encoder + json.dumps, per-item
+# model_validate) with the compiled one (orjson / TypeAdapter.dump_json) on
+# synthetic rows shaped like the task and schedule list endpoints. No database needed.
+
+
+def task_rows(n: int):
+    start = datetime(2026, 1, 1, 9, 0)
+    return [{
+        "id": i,
+        "title": f"Task {i}",
+        "description": "Read chapter and solve the exercises",
+        "priority": "medium",
+        "deadline": start + timedelta(hours=i),
+        "estimated_minutes": 90,
+        "actual_minutes": None,
+        "status": TaskStatus.TODO,
+        "subject_id": i % 20,
+        "subject_name": f"Subject {i % 20}",
+        "completed_at": None,
+        "created_at": start,
+    } for i in range(n)]
+
+
+def schedule_rows(n: int):
+    # attribute access like ORM objects
+    start = datetime(2026, 1, 1, 9, 0)
+    return [SimpleNamespace(
+        id=i,
+        title=f"Block {i}",
+        description="Blok 1 z 2",
+        start_time=start + timedelta(hours=i),
+        end_time=start + timedelta(hours=i, minutes=90),
+        task_id=i,
+        subject_id=i % 20,
+        user_id=1,
+        color="blue",
+        is_generated=True,
+        created_at=start,
+        updated_at=start,
+    ) for i in range(n)]
+
+
+def measure(fn, repeat: int) -> float:
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def cases(n: int):
+    tasks = task_rows(n)
+    schedules = schedule_rows(n)
+    return [
+        ("tasks: jsonable_encoder + json", lambda: json.dumps(jsonable_encoder(tasks)).encode()),
+        ("tasks: jsonable_encoder + orjson", lambda: ORJSONResponse(jsonable_encoder(tasks)).body),
+        ("tasks: orjson direct", lambda: json_response(tasks).body),
+        ("schedule: model_validate + json", lambda: json.dumps(jsonable_encoder(
+            [ScheduleOut.model_validate(s, from_attributes=True) for s in schedules])).encode()),
+        ("schedule: TypeAdapter.dump_json", lambda: json_response(schedules, adapter=ScheduleList).body),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time JSON serialization of list responses")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.rows} rows, best of {args.repeat}")
+    for name, fn in cases(args.rows):
+        print(f"{name:<36} {measure(fn, args.repeat):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import event, func
+from app.database.session import SessionLocal, engine
+from app.models.task import Task
+from app.models.user import User  # noqa: F401 - registers the mapper used by relationships
+from app.services import jobs, schedule, stats, subjects, tasks
+
+# Runs the read services for one user, captures every SELECT they issue and
+# EXPLAINs it with sequential scans disabled: if the planner still picks a
+# Seq Scan, no index can serve that query and the hot path has regressed.
+# tests/test_query_plans.py runs the same checks under pytest.
+
+
+def hot_paths(user_id: int, task_id: int):
+    now = datetime.utcnow()
+    today = now.date()
+    return {
+        "tasks.list": lambda db: tasks.list_user_tasks(db, user_id, limit=50),
+        "tasks.list_by_status": lambda db: tasks.list_user_tasks(db, user_id, status="todo", limit=50),
+        "tasks.list_by_deadline": lambda db: tasks.list_user_tasks(db, user_id, deadline_from=now, deadline_to=now + timedelta(days=7)),
+        "tasks.get": lambda db: tasks.get_task_by_id(db, task_id, user_id),
+        "schedule.list": lambda db: schedule.list_user_schedules(db, user_id, now, now + timedelta(days=7)),
+        "schedule.busy_intervals": lambda db: schedule.list_busy_intervals(db, user_id, now),
+        "subjects.with_stats": lambda db: subjects.get_user_subjects_with_stats(db, user_id),
+        "statistics.overview": lambda db: stats.get_user_statistics(db, user_id),
+        "statistics.timeseries": lambda db: stats.get_time_series(db, user_id, today - timedelta(days=29), today),
+        "jobs.active": lambda db: jobs.get_active_job(db, user_id, "generate_schedule"),
+    }
+
+
+def capture_selects(fn):
+    """Run fn(db) and return the (sql, params) of every SELECT it executed"""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    db = SessionLocal()
+    try:
+        fn(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        db.rollback()
+        db.close()
+    return captured
+
+
+def seq_scans(plan: dict):
+    """Relations read by a Seq Scan anywhere in the plan tree"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def explain(sql: str, params):
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        rows = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, params).scalar()
+        conn.rollback()
+    plan = rows if isinstance(rows, list) else json.loads(rows)
+    return plan[0]["Plan"]
+
+
+def pick_user(db):
+    """The user with the most tasks, so the planner sees a realistic distribution"""
+    row = db.query(Task.user_id, func.count(Task.id)).group_by(
+        Task.user_id
+    ).order_by(func.count(Task.id).desc()).first()
+    return row[0] if row else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when a hot read query can only be served by a sequential scan")
+    parser.add_argument("--user", type=int, help="user id to run the queries for (default: the user with most tasks)")
+    parser.add_argument("--verbose", action="store_true", help="print every captured statement")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("Query plan checks need PostgreSQL (run seed.py against it first)")
+        return 2
+
+    db = SessionLocal()
+    try:
+        user_id = args.user or pick_user(db)
+        if user_id is None:
+            print("No tasks found: seed the database first (python seed.py)")
+            return 2
+        task_id = db.query(Task.id).filter(Task.user_id == user_id).limit(1).scalar()
+    finally:
+        db.close()
+
+    failures = 0
+    for name, fn in hot_paths(user_id, task_id).items():
+        for sql, params in capture_selects(fn):
+            relations = seq_scans(explain(sql, params))
+            if relations:
+                failures += 1
+                print(f"FAIL {name}: Seq Scan on {', '.join(sorted(set(relations)))}")
+                print("     " + " ".join(sql.split()))
+            else:
+                print(f"ok   {name}")
+                if args.verbose:
+                    print("     " + " ".join(sql.split()))
+
+    if failures:
+        print(f"{failures} statement(s) fall back to sequential scans")
+        return 1
+    print("All hot paths are served by indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
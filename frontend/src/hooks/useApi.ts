@@ -72,9 +72,15 @@ export function useTasks(subject_id?: number) {
   return useQuery({
     queryKey: ["tasks", subject_id],
     queryFn: async () => {
-      const url = subject_id ? `/tasks?subject_id=${subject_id}` : "/tasks"
-      const response = await api.get(url)
-      return response.data
+      // the list is paginated: follow X-Next-Cursor until the last page
+      const tasks = []
+      let cursor: string | undefined
+      do {
+        const response = await api.get("/tasks", { params: { subject_id, cursor, limit: 500 } })
+        tasks.push(...response.data)
+        cursor = response.headers["x-next-cursor"]
+      } while (cursor)
+      return tasks
     },
   })
 }
@@ -0,0 +1,48 @@
+import argparse
+from app.database.session import SessionLocal
+from app.models.subject import Subject  # noqa: F401 - registers the mapper used by relationships
+from app.models.user import User
+from app.services.rollups import rebuild_user_rollups
+
+
+def rebuild_all(db, user_ids=None, batch_size: int = 500):
+    query = db.query(User.id).order_by(User.id)
+    if user_ids:
+        query = query.filter(User.id.in_(user_ids))
+
+    rebuilt = 0
+    last_id = 0
+    while True:
+        batch = [row.id for row in query.filter(User.id > last_id).limit(batch_size)]
+        if not batch:
+            break
+        for user_id in batch:
+            rebuild_user_rollups(db, user_id)
+        # one transaction per batch keeps locks short on large installations
+        db.commit()
+        rebuilt += len(batch)
+        last_id = batch[-1]
+        print(f"Rebuilt stats for {rebuilt} users")
+
+    return rebuilt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild per-user statistics rollups from the task and schedule tables")
+    parser.add_argument("--user", type=int, action="append", dest="user_ids", help="only rebuild this user id (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        total = rebuild_all(db, args.user_ids, args.batch_size)
+        print(f"Done: {total} users")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,20 @@
+import argparse
 import random
+from itertools import accumulate
+import time
 from datetime import datetime, timedelta
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
+from app.database.bulk import bulk_insert
 from app.database.session import SessionLocal, engine
 from app.database.base import Base
 from app.models.user import User
 from app.models.subject import Subject
+from app.models.schedule import Schedule
 from app.models.task import Task, TaskStatus
 from app.core.security import hash_pwd
+from app.services.rollups import rebuild_user_rollups
+from app.services.scheduler import get_priority_color
 
 
 def create_demo_user(db: Session) -> User:
@@ -197,6 +205,7 @@ def create_demo_tasks(db: Session, subjects: list[Subject]) -> list[Task]:
                     estimated_minutes=task_data["estimated_minutes"],
                     status=status,
                     subject_id=subject.id,
+                    user_id=subject.user_id,
                     completed_at=completed_at
                 )
                 db.add(task)
@@ -229,6 +238,8 @@ def seed_database():
         user = create_demo_user(db)
         subjects = create_demo_subjects(db, user.id)
         tasks = create_demo_tasks(db, subjects)
+        rebuild_user_rollups(db, user.id)
+        db.commit()
 
         print("\n" + "="*60)
         print("Seeding Completed")
@@ -245,5 +256,218 @@ def seed_database():
         db.close()
 
 
+# Synthetic data for load tests and benchmarks. Everything is drawn from one
+# random.Random(seed) relative to a fixed anchor day, so the same arguments
+# always produce the same rows.
+
+SUBJECT_NAMES = [
+    "Matematyka", "Historia", "Fizyka", "Angielski", "Programowanie",
+    "Chemia", "Biologia", "Geografia", "Filozofia", "Ekonomia",
+]
+# (values, cumulative weights) for rng.choices
+PRIORITIES = (["low", "medium", "high", "urgent"], list(accumulate([25, 45, 25, 5])))
+ESTIMATES = ([30, 45, 60, 90, 120, 180, 240], list(accumulate([10, 15, 25, 20, 15, 10, 5])))
+STATUSES = [TaskStatus.todo, TaskStatus.in_progress, TaskStatus.done]
+OVERDUE_STATUS_WEIGHTS = list(accumulate([15, 5, 80]))
+UPCOMING_STATUS_WEIGHTS = list(accumulate([65, 20, 15]))
+# heavy-tailed (80/20-ish) task volume per user, capped so one user stays loadable
+USER_WEIGHT_ALPHA = 1.16
+USER_WEIGHT_CAP = 50.0
+
+
+def _user_weights(rng: random.Random, count: int) -> list:
+    weights = [min(rng.paretovariate(USER_WEIGHT_ALPHA), USER_WEIGHT_CAP) for _ in range(count)]
+    scale = count / sum(weights)
+    return [w * scale for w in weights]
+
+
+def _task_row(rng: random.Random, anchor: datetime, user_id: int, subject_id: int, number: int) -> dict:
+    # deadlines from three months back to two months ahead; past ones are mostly done
+    deadline = anchor + timedelta(minutes=rng.randint(-90 * 24 * 60, 60 * 24 * 60))
+    created_at = min(deadline - timedelta(minutes=rng.randint(3 * 24 * 60, 30 * 24 * 60)), anchor)
+    overdue = deadline < anchor
+    status = rng.choices(STATUSES, cum_weights=OVERDUE_STATUS_WEIGHTS if overdue else UPCOMING_STATUS_WEIGHTS)[0]
+    estimated = rng.choices(ESTIMATES[0], cum_weights=ESTIMATES[1])[0]
+
+    completed_at = None
+    actual_minutes = None
+    if status == TaskStatus.done:
+        # most work is finished before the deadline, some of it late
+        latest = min(deadline + timedelta(days=2), anchor)
+        span = max(int((latest - created_at).total_seconds()), 60)
+        completed_at = created_at + timedelta(seconds=int(span * rng.betavariate(4, 1.5)))
+        actual_minutes = max(15, min(1440, int(estimated * rng.lognormvariate(0, 0.35))))
+
+    return {
+        "title": f"Zadanie {number}",
+        "description": None,
+        "priority": rng.choices(PRIORITIES[0], cum_weights=PRIORITIES[1])[0],
+        "deadline": deadline,
+        "estimated_minutes": estimated,
+        "actual_minutes": actual_minutes,
+        "status": status,
+        "subject_id": subject_id,
+        "user_id": user_id,
+        "completed_at": completed_at,
+        "created_at": created_at,
+        "updated_at": completed_at or created_at,
+    }
+
+
+def _schedule_rows(rng: random.Random, anchor: datetime, user_id: int, tasks: list, count: int) -> list:
+    """Non-overlapping study blocks within working hours, two weeks back and forward"""
+    rows = []
+    cursor = anchor - timedelta(days=14) + timedelta(hours=9)
+    for _ in range(count if tasks else 0):
+        cursor += timedelta(minutes=rng.choice([15, 30, 45, 60, 120]))
+        if cursor.hour >= 17:
+            cursor = cursor.replace(hour=9, minute=0) + timedelta(days=1)
+        length = timedelta(minutes=rng.choice([30, 45, 60, 90]))
+        task_id, subject_id, title, priority = rng.choice(tasks)
+        rows.append({
+            "user_id": user_id,
+            "title": title,
+            "description": None,
+            "start_time": cursor,
+            "end_time": cursor + length,
+            "task_id": task_id,
+            "subject_id": subject_id,
+            "color": get_priority_color(priority),
+            "is_generated": True,
+            "created_at": anchor,
+            "updated_at": anchor,
+        })
+        cursor += length
+    return rows
+
+
+def generate_dataset(
+    db: Session,
+    users: int,
+    subjects_per_user: int,
+    tasks_per_subject: int,
+    schedules_per_user: int,
+    seed: int,
+    anchor: datetime,
+    password: str = "loadtest123",
+    batch_users: int = 200,
+    rollups: bool = True,
+):
+    """
+    Create `users` users named user<N>@example.com with their subjects, tasks and
+    schedule entries. Rows go through bulk_insert (COPY on Postgres), one
+    transaction per batch of users; every user shares one pre-computed hash.
+    """
+    rng = random.Random(seed)
+    password_hash = hash_pwd(password)
+    weights = _user_weights(rng, users)
+    totals = {"users": 0, "subjects": 0, "tasks": 0, "schedules": 0}
+    started = time.perf_counter()
+
+    for batch_start in range(0, users, batch_users):
+        numbers = range(batch_start, min(batch_start + batch_users, users))
+        user_ids = db.scalars(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [{
+                "email": f"user{n}@example.com",
+                "username": f"user{n}",
+                "password": password_hash,
+                "role": "user",
+                "created_at": anchor - timedelta(days=120),
+            } for n in numbers],
+        ).all()
+
+        subject_rows = [
+            {"name": SUBJECT_NAMES[i % len(SUBJECT_NAMES)], "description": None, "user_id": user_id}
+            for user_id in user_ids for i in range(subjects_per_user)
+        ]
+        subject_ids = db.scalars(
+            insert(Subject).returning(Subject.id, sort_by_parameter_order=True), subject_rows
+        ).all() if subject_rows else []
+
+        tasks = []
+        for position, (n, user_id) in enumerate(zip(numbers, user_ids)):
+            count = max(0, round(tasks_per_subject * weights[n]))
+            own = subject_ids[position * subjects_per_user:(position + 1) * subjects_per_user]
+            for subject_id in own:
+                for _ in range(count):
+                    tasks.append(_task_row(rng, anchor, user_id, subject_id, len(tasks) + 1))
+        bulk_insert(db, Task, tasks)
+
+        schedules = []
+        if schedules_per_user:
+            owned = {}
+            for row in db.execute(
+                select(Task.id, Task.subject_id, Task.title, Task.priority, Task.user_id)
+                .where(Task.user_id.in_(user_ids), Task.status != TaskStatus.done)
+                .order_by(Task.id)
+            ):
+                owned.setdefault(row.user_id, []).append(tuple(row[:4]))
+            for user_id in user_ids:
+                schedules.extend(_schedule_rows(rng, anchor, user_id, owned.get(user_id, []), schedules_per_user))
+            bulk_insert(db, Schedule, schedules)
+
+        if rollups:
+            for user_id in user_ids:
+                rebuild_user_rollups(db, user_id)
+        db.commit()
+
+        totals["users"] += len(user_ids)
+        totals["subjects"] += len(subject_ids)
+        totals["tasks"] += len(tasks)
+        totals["schedules"] += len(schedules)
+        elapsed = time.perf_counter() - started
+        print(f"{totals['users']}/{users} users, {totals['tasks']} tasks, {totals['schedules']} schedules ({elapsed:.1f}s)")
+
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Seed the demo user, or generate a synthetic dataset when --users is given"
+    )
+    parser.add_argument("--users", type=int, help="number of synthetic users to generate")
+    parser.add_argument("--subjects-per-user", type=int, default=5)
+    parser.add_argument("--tasks-per-subject", type=int, default=20, help="average; heavy users get many more")
+    parser.add_argument("--schedules", type=int, default=0, help="schedule entries per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", type=lambda v: datetime.strptime(v, "%Y-%m-%d"),
+                        help="day the data is generated around (default: today); fix it for identical datasets")
+    parser.add_argument("--password", default="loadtest123", help="password shared by all synthetic users")
+    parser.add_argument("--batch-users", type=int, default=200, help="users per transaction")
+    parser.add_argument("--skip-rollups", action="store_true", help="leave rollups to rebuild_stats.py")
+    args = parser.parse_args()
+
+    if args.users is None:
+        seed_database()
+        return
+
+    anchor = args.anchor or datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    db = SessionLocal()
+    try:
+        if db.query(User.id).filter(User.email == "user0@example.com").first():
+            print("Warning: synthetic users already exist. Generate into an empty database.")
+            return
+        totals = generate_dataset(
+            db,
+            users=args.users,
+            subjects_per_user=args.subjects_per_user,
+            tasks_per_subject=args.tasks_per_subject,
+            schedules_per_user=args.schedules,
+            seed=args.seed,
+            anchor=anchor,
+            password=args.password,
+            batch_users=args.batch_users,
+            rollups=not args.skip_rollups,
+        )
+        print(f"Done: {totals}")
+        print(f"Log in as user0@example.com / {args.password}")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 if __name__ == "__main__":
-    seed_database()
+    main()
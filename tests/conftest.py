@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+# The app reads its settings when it is imported, so the test database is
+# chosen before anything from app is imported. TEST_DATABASE_URL must point at
+# a disposable database: it is migrated and seeded. Without it the tests run on
+# a temporary SQLite file and the PostgreSQL-only ones are skipped.
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL") or "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="study-planner-tests-"), "test.db"
+)
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+for name in ("ASYNC_DATABASE_URL", "DATABASE_READ_URL", "ASYNC_DATABASE_READ_URL"):
+    os.environ.pop(name, None)
+# cheap password hashes, computed in the test process
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["HASH_WORKERS"] = "0"
+
+from datetime import datetime  # noqa: E402
+import pytest  # noqa: E402
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "secret123"
+
+
+@pytest.fixture(scope="session")
+def migrated():
+    command.upgrade(Config(os.path.join(ROOT, "alembic.ini")), "head")
+
+
+@pytest.fixture(scope="session")
+def seeded(migrated):
+    """The synthetic dataset of seed.py, generated once per test database"""
+    import seed
+    from app.database.session import SessionLocal, engine
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        if db.query(User.id).filter(User.email == "user0@example.com").first() is None:
+            seed.generate_dataset(
+                db, users=50, subjects_per_user=5, tasks_per_subject=20, schedules_per_user=20,
+                seed=1, anchor=datetime(2026, 1, 1),
+            )
+    finally:
+        db.close()
+
+    if engine.dialect.name == "postgresql":
+        # fresh statistics, so the planner sees the seeded distribution
+        with engine.connect() as conn:
+            conn.exec_driver_sql("ANALYZE")
+            conn.commit()
+
+
+@pytest.fixture(scope="session")
+def client(migrated):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def auth(client):
+    """Authorization headers of a new user"""
+    count = auth.count = getattr(auth, "count", 0) + 1
+    email = f"tester{count}-{os.getpid()}@example.com"
+    client.post("/auth/register", json={"email": email, "username": email.split("@")[0], "password": PASSWORD})
+    token = client.post("/auth/login", json={"email": email, "password": PASSWORD}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,54 @@
+import pytest
+from app.core.tracing import assert_max_queries
+
+# Statements per request on the main read endpoints. The bounds do not depend
+# on how many subjects and tasks the user has: a lazy load per task or a query
+# per subject pushes a request over them.
+
+SUBJECTS = 4
+TASKS_PER_SUBJECT = 3
+
+
+@pytest.fixture
+def task_ids(client, auth):
+    ids = []
+    for s in range(SUBJECTS):
+        subject_id = client.post("/subjects/", json={"name": f"Subject {s}"}, headers=auth).json()["id"]
+        for t in range(TASKS_PER_SUBJECT):
+            task = {
+                "title": f"Task {s}.{t}",
+                "deadline": "2026-11-01T10:00:00",
+                "estimated_minutes": 30,
+                "subject_id": subject_id,
+            }
+            ids.append(client.post("/tasks/", json=task, headers=auth).json()["id"])
+    return ids
+
+
+def test_task_list(client, auth, task_ids):
+    # data version, then tasks joined with their subject names
+    with assert_max_queries(2) as traces:
+        response = client.get("/tasks/", headers=auth)
+    assert response.status_code == 200
+    assert len(response.json()) == len(task_ids)
+    assert all(task["subject_name"] for task in response.json())
+    assert len(traces) == 1
+
+
+def test_task_detail(client, auth, task_ids):
+    # data version, then the task with its subject
+    for task_id in task_ids[:2]:
+        with assert_max_queries(2) as traces:
+            response = client.get(f"/tasks/{task_id}", headers=auth)
+        assert response.status_code == 200
+        assert response.json()["subject_name"]
+        assert len(traces) == 1
+
+
+def test_subject_breakdown(client, auth, task_ids):
+    # data version, then one grouped query over all subjects
+    with assert_max_queries(2) as traces:
+        response = client.get("/statistics/subjects", headers=auth)
+    assert response.status_code == 200
+    assert len(response.json()) == SUBJECTS
+    assert len(traces) == 1
@@ -0,0 +1,33 @@
+import pytest
+import check_query_plans as plans
+from app.database.session import SessionLocal, engine
+from app.models.task import Task
+
+# EXPLAIN every SELECT of the hot read paths (see check_query_plans.py) on the
+# seeded dataset, with sequential scans disabled: a Seq Scan left in the plan
+# means no index can serve the query.
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="query plans are checked on PostgreSQL: set TEST_DATABASE_URL",
+)
+
+
+@pytest.fixture(scope="module")
+def hot_paths(seeded):
+    db = SessionLocal()
+    try:
+        user_id = plans.pick_user(db)
+        task_id = db.query(Task.id).filter(Task.user_id == user_id).limit(1).scalar()
+    finally:
+        db.close()
+    return plans.hot_paths(user_id, task_id)
+
+
+@pytest.mark.parametrize("name", list(plans.hot_paths(0, 0)))
+def test_hot_path_is_served_by_indexes(hot_paths, name):
+    statements = plans.capture_selects(hot_paths[name])
+    assert statements, f"{name} ran no SELECT"
+    for sql, params in statements:
+        relations = plans.seq_scans(plans.explain(sql, params))
+        assert not relations, f"{name}: Seq Scan on {', '.join(sorted(set(relations)))}: {' '.join(sql.split())}"